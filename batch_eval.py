@@ -0,0 +1,94 @@
+"""
+NumPy batch evaluator for many hands at once.
+
+Takes an (N, 7) array of integer cards (see cards.py) and returns the
+category and packed strength of every row using the same lookup tables
+as evaluator.py, with array operations instead of a Python loop per hand:
+
+* the rank key of each row is a sum of 5**rank, looked up with
+  searchsorted in the sorted keys of evaluator.RANK_STRENGTH
+* flushes are found with the same biased 4-bit suit counters and their
+  rank masks index evaluator.FLUSH_STRENGTH directly
+
+Rows with 5 or 6 cards work too. Results agree exactly with
+evaluator.strength_cards() and evaluator.evaluate_cards().
+
+random_boards() deals the rest of many boards at once, for the Monte
+Carlo runs in equity.py and ranges.py.
+
+Requires numpy.
+"""
+
+import numpy as np
+
+from cards import CARD_INDEX
+from evaluator import (CATEGORY_SHIFT, FLUSH_BITS, FLUSH_STRENGTH, RANK_KEY, RANK_BIT,
+                       RANK_STRENGTH, SUIT_KEY, SUIT_START)
+
+CHUNK_SIZE = 1 << 16
+
+_RANK_KEY = np.array(RANK_KEY, dtype=np.int64)
+_SUIT_KEY = np.array(SUIT_KEY, dtype=np.int32)
+_RANK_BIT = np.array(RANK_BIT, dtype=np.int32)
+_FLUSH_STRENGTH = np.array(FLUSH_STRENGTH, dtype=np.int32)
+_KEYS = np.array(sorted(RANK_STRENGTH), dtype=np.int64)
+_KEY_STRENGTH = np.array([RANK_STRENGTH[key] for key in _KEYS.tolist()], dtype=np.int32)
+# flush bit (8 << 4 * suit) -> suit
+_FLUSH_SUIT = np.zeros(FLUSH_BITS + 1, dtype=np.int8)
+for _suit in range(4):
+    _FLUSH_SUIT[8 << (4 * _suit)] = _suit
+
+def cards_array(hands):
+    """Convert lists of "Rank of Suit" strings to an (N, k) uint8 card array."""
+    return np.array([[CARD_INDEX[card] for card in hand] for hand in hands], dtype=np.uint8)
+
+def _strengths(cards):
+    keys = _RANK_KEY[cards].sum(axis=1)
+    strengths = _KEY_STRENGTH[np.searchsorted(_KEYS, keys)]
+    flush = (SUIT_START + _SUIT_KEY[cards].sum(axis=1)) & FLUSH_BITS
+    rows = np.flatnonzero(flush)
+    if len(rows):
+        flush_cards = cards[rows]
+        suits = _FLUSH_SUIT[flush[rows]]
+        in_suit = (flush_cards & 3) == suits[:, None]
+        masks = (_RANK_BIT[flush_cards] * in_suit).sum(axis=1)
+        strengths[rows] = _FLUSH_STRENGTH[masks]
+    return strengths
+
+def random_boards(board, dead, count, rng):
+    """(count, 5) uint8 array of boards starting with `board`, the rest dealt at random.
+
+    Cards in board or dead are never dealt; rng is a numpy Generator.
+    """
+    known = set(board) | set(dead)
+    remaining = np.array([card for card in range(52) if card not in known], dtype=np.uint8)
+    need = 5 - len(board)
+    boards = np.empty((count, 5), dtype=np.uint8)
+    boards[:, :len(board)] = board
+    if need:
+        # The `need` smallest of a row of random keys pick a uniform random subset
+        picks = np.argpartition(rng.random((count, len(remaining))), need - 1, axis=1)[:, :need]
+        boards[:, len(board):] = remaining[picks]
+    return boards
+
+def strength_batch(cards, chunk_size=CHUNK_SIZE):
+    """Packed strengths (int32, shape (N,)) for an (N, k) card array."""
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError(f"expected an (N, 5..7) card array, got shape {cards.shape}")
+    cards = cards.astype(np.intp, copy=False)
+    out = np.empty(len(cards), dtype=np.int32)
+    # Work in chunks so the temporaries stay in cache
+    for start in range(0, len(cards), chunk_size):
+        out[start:start + chunk_size] = _strengths(cards[start:start + chunk_size])
+    return out
+
+def evaluate_batch(cards, chunk_size=CHUNK_SIZE):
+    """Return (categories, strengths) arrays for an (N, k) card array.
+
+    cards may also be a list of "Rank of Suit" string hands.
+    """
+    if len(cards) and isinstance(cards[0], (list, tuple)) and isinstance(cards[0][0], str):
+        cards = cards_array(cards)
+    strengths = strength_batch(cards, chunk_size)
+    return strengths >> CATEGORY_SHIFT, strengths
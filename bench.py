@@ -0,0 +1,292 @@
+"""
+Benchmarks for the hot paths of the practice games.
+
+Runs fixed, seeded workloads through the hand evaluator, hand comparison,
+round dealing and (when Flask is installed) the web routes, and reports
+throughput, the median time per operation over several runs and traced
+memory for each one: the bytes and blocks per operation a run allocates
+(tracemalloc snapshots taken before it and at its end, while what it made
+is still alive, adding up what grew line by line) and the peak of memory
+allocated during the run:
+
+    python3 bench.py
+    python3 bench.py --save baseline.json
+    python3 bench.py --compare baseline.json --threshold 0.15
+
+With --compare the run fails (exit status 1) when any benchmark's
+throughput drops more than the threshold below the saved baseline, or
+its allocated bytes per operation or peak grow more than the threshold
+above it. Comparing needs at least MIN_COMPARE_REPEATS runs of each
+benchmark, as single runs vary too much between invocations.
+The web routes run with the round pool off, so its refill thread does not
+compete with the requests being timed.
+Everything runs locally; nothing touches the network.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from cards import DECK, RANKS, SUITS
+from dealer import Dealer
+from evaluator import (compare_hands, compare_strengths, evaluate_cards, evaluate_hand,
+                       evaluate_hand_reference, hand_category, hand_strength, strength_cards)
+
+SEED = 12345
+HANDS = 20000
+STRATIFIED_HANDS = 5000
+ROUNDS = 5000
+WEB_ROUNDS = 200
+REPEATS = 5
+MIN_COMPARE_REPEATS = 3
+ALLOC_SLACK = 16  # bytes per op of allocation noise ignored by --compare
+PEAK_SLACK = 64 * 1024  # bytes of peak noise ignored by --compare
+
+# --- Workloads ---
+
+def random_hands(rng, count):
+    return [rng.sample(range(52), 7) for _ in range(count)]
+
+def stratified_hands(rng, category, count):
+    """Random 7-card hands of one category (drawn by rejection at setup time)."""
+    hands = []
+    while len(hands) < count:
+        hand = rng.sample(range(52), 7)
+        if hand_category(strength_cards(hand)) == category:
+            hands.append(hand)
+    return hands
+
+def deal_round_string_deck(rng):
+    # How play_game and /new_round dealt before dealer.py
+    deck = [f"{rank} of {suit}" for suit in SUITS for rank in RANKS]
+    rng.shuffle(deck)
+    player_hand = [deck.pop(), deck.pop()]
+    dealer_hand = [deck.pop(), deck.pop()]
+    community_cards = [deck.pop() for _ in range(5)]
+    return player_hand, dealer_hand, community_cards
+
+def play_round(dealer):
+    player_hand, dealer_hand, community_cards = dealer.deal_round_strings()
+    player_strength = hand_strength(player_hand + community_cards)
+    dealer_strength = hand_strength(dealer_hand + community_cards)
+    return compare_strengths(player_strength, dealer_strength)
+
+# --- Benchmarks ---
+#
+# Each suite builds its workloads from the seeded rng and yields
+# (name, run, ops): run() performs `ops` operations of the hot path once
+# and returns what they made, so measure() sees it allocated.
+
+def _over(func, items):
+    def run():
+        return [func(item) for item in items]
+    return run
+
+def bench_evaluators(rng):
+    hands = random_hands(rng, HANDS)
+    strings = [[DECK[card] for card in hand] for hand in hands]
+    yield 'evaluate_hand_reference', _over(evaluate_hand_reference, strings[:HANDS // 4]), HANDS // 4
+    yield 'evaluate_hand', _over(evaluate_hand, strings), HANDS
+    yield 'evaluate_cards', _over(evaluate_cards, hands), HANDS
+    yield 'hand_strength', _over(hand_strength, strings), HANDS
+    yield 'strength_cards', _over(strength_cards, hands), HANDS
+    for name, category in (('flush', 5), ('straight', 4), ('full_house', 6)):
+        subset = stratified_hands(rng, category, STRATIFIED_HANDS)
+        yield f'strength_cards[{name}]', _over(strength_cards, subset), STRATIFIED_HANDS
+    try:
+        import numpy as np
+        from batch_eval import strength_batch
+    except ImportError:
+        return
+    array = np.array(hands, dtype=np.uint8)
+    yield 'strength_batch', lambda: strength_batch(array), HANDS
+
+def bench_compare(rng):
+    hands = random_hands(rng, HANDS)
+    results = [evaluate_cards(hand) for hand in hands]
+    strengths = [strength_cards(hand) for hand in hands]
+    result_pairs = list(zip(results, results[1:]))
+    strength_pairs = list(zip(strengths, strengths[1:]))
+
+    def run_hands():
+        return [compare_hands(a, b) for a, b in result_pairs]
+
+    def run_strengths():
+        return [compare_strengths(a, b) for a, b in strength_pairs]
+
+    yield 'compare_hands', run_hands, len(result_pairs)
+    yield 'compare_strengths', run_strengths, len(strength_pairs)
+
+def bench_rounds(rng):
+    dealer = Dealer(rng.getrandbits(64))
+
+    def run_string_deck():
+        return [deal_round_string_deck(rng) for _ in range(ROUNDS)]
+
+    def run_deal():
+        return [dealer.deal_round_strings() for _ in range(ROUNDS)]
+
+    def run_play():
+        return [play_round(dealer) for _ in range(ROUNDS)]
+
+    yield 'deal_round[string deck]', run_string_deck, ROUNDS
+    yield 'deal_round', run_deal, ROUNDS
+    yield 'play_round', run_play, ROUNDS
+    try:
+        import numpy
+    except ImportError:
+        return
+    yield 'deal_many', lambda: dealer.deal_many(ROUNDS), ROUNDS
+
+def bench_web(rng):
+    # Without the round pool /new_round deals on the request thread, and no
+    # refill thread competes with the timed requests
+    os.environ.setdefault('ROUND_POOL_HIGH', '0')
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web_practice'))
+        from app import app
+    except ImportError:
+        return
+    client = app.test_client()
+    answers = {'start_hand_time': '0', 'start_winner_time': '0',
+               'player_hand': '1', 'dealer_hand': '1', 'winner': 'player'}
+    client.get('/')
+
+    def route(method, path, **kwargs):
+        def run():
+            return [getattr(client, method)(path, **kwargs) for _ in range(WEB_ROUNDS)]
+        return run
+
+    def run_round():
+        responses = []
+        for _ in range(WEB_ROUNDS):
+            responses.append(client.get('/new_round'))
+            responses.append(client.get('/quiz'))
+            responses.append(client.post('/quiz', data=answers))
+            responses.append(client.get('/result'))
+        return responses
+
+    # Order matters: the later routes need a dealt round in the session
+    yield 'web:/', route('get', '/'), WEB_ROUNDS
+    yield 'web:/new_round', route('get', '/new_round'), WEB_ROUNDS
+    yield 'web:/quiz GET', route('get', '/quiz'), WEB_ROUNDS
+    yield 'web:/quiz POST', route('post', '/quiz', data=answers), WEB_ROUNDS
+    yield 'web:/result', route('get', '/result'), WEB_ROUNDS
+    yield 'web:round', run_round, WEB_ROUNDS
+
+SUITES = {
+    'evaluate': bench_evaluators,
+    'compare': bench_compare,
+    'rounds': bench_rounds,
+    'web': bench_web,
+}
+
+def measure(run, ops, repeats):
+    """Median-of-`repeats` timing plus traced memory for one benchmark."""
+    run()  # warm up caches and lazily built tables
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        run()
+        times.append(time.perf_counter_ns() - start)
+    median = statistics.median(times)
+    tracemalloc.start()
+    # The snapshots are traced too; leave tracemalloc's own allocations out
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    start_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    made = run()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot().filter_traces(ignore)
+    del made
+    tracemalloc.stop()
+    # Line by line, so memory a run frees in one place does not cancel what it allocates in another
+    grown = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+    return {
+        'ops': ops,
+        'ns_per_op': median / ops,
+        'ops_per_sec': ops * 1e9 / median,
+        'alloc_bytes_per_op': sum(stat.size_diff for stat in grown) / ops,
+        'alloc_blocks_per_op': sum(max(stat.count_diff, 0) for stat in grown) / ops,
+        'peak_bytes': peak - start_bytes,
+    }
+
+def run_benchmarks(suites, repeats=REPEATS, seed=SEED, name_filter=None):
+    results = {}
+    for suite in suites:
+        rng = random.Random(seed)
+        for name, run, ops in SUITES[suite](rng):
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = measure(run, ops, repeats)
+            report_line(name, results[name])
+    return results
+
+def report_line(name, result, baseline=None):
+    line = (f"{name:32} {result['ops_per_sec']:14,.0f} ops/s {result['ns_per_op']:12,.0f} ns/op "
+            f"{result['alloc_bytes_per_op']:9,.1f} B/op {result['alloc_blocks_per_op']:7,.2f} blocks/op "
+            f"{result['peak_bytes'] / 1024:9,.1f} KiB peak")
+    if baseline:
+        line += f"  {result['ops_per_sec'] / baseline['ops_per_sec'] - 1:+7.1%} vs baseline"
+    print(line)
+
+def _grew(result, base, key, threshold, slack):
+    # Baselines saved before a figure existed do not have it
+    return key in base and result[key] > base[key] * (1 + threshold) + slack
+
+def compare_to_baseline(results, baseline, threshold):
+    """Names of benchmarks that got more than `threshold` slower or more memory hungry than baseline."""
+    regressions = []
+    print(f"\nCompared to baseline (fail beyond {threshold:.0%}):")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        report_line(name, result, base)
+        if result['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+            regressions.append(name)
+        elif (_grew(result, base, 'alloc_bytes_per_op', threshold, ALLOC_SLACK)
+              or _grew(result, base, 'peak_bytes', threshold, PEAK_SLACK)):
+            regressions.append(f"{name} (memory)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluator, comparison, dealing and web routes.")
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES),
+                        help="suite to run (repeatable); default all")
+    parser.add_argument('--filter', default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--save', metavar='JSON', help="write results as a new baseline")
+    parser.add_argument('--compare', metavar='JSON', help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed throughput drop before failing, e.g. 0.10 for 10%%")
+    args = parser.parse_args()
+    if args.compare and args.repeats < MIN_COMPARE_REPEATS:
+        parser.error(f"--compare needs --repeats {MIN_COMPARE_REPEATS} or more")
+
+    print(f"Python {platform.python_version()} on {platform.machine()}, seed {args.seed}\n")
+    results = run_benchmarks(args.suite or list(SUITES), args.repeats, args.seed, args.filter)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'results': results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+if __name__ == "__main__":
+    main()
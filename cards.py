@@ -0,0 +1,140 @@
+"""
+Integer card encoding for the Texas Hold'em practice games.
+
+The games show cards as strings like "Queen of Diamonds". For evaluation
+and simulation we work with small integers instead:
+
+    card = rank_index * 4 + suit_index
+
+where rank_index is 0 for '2' up to 12 for 'Ace' and suit_index follows
+the order of SUITS. So every card is an int from 0 to 51, the rank is
+card >> 2 and the suit is card & 3.
+
+A round's 9 cards also fit in a 10 character token (see round_token()),
+short enough for session data and URLs.
+"""
+
+import base64
+from math import perm
+
+SUITS = {
+    'Spades': '♠',
+    'Clubs': '♣',
+    'Hearts': '♥',
+    'Diamonds': '♦'
+}
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
+RANK_VALUES = {r: i for i, r in enumerate(RANKS, start=2)}
+SUIT_NAMES = list(SUITS)
+
+# Hand category names; HAND_OPTIONS[c] names category number c of evaluator.py
+HAND_OPTIONS = [
+    "High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush"
+]
+
+# DECK[i] is the card string for integer card i
+DECK = [f"{rank} of {suit}" for rank in RANKS for suit in SUIT_NAMES]
+CARD_INDEX = {card: i for i, card in enumerate(DECK)}
+
+def card_to_int(card):
+    return CARD_INDEX[card]
+
+def int_to_card(card):
+    return DECK[card]
+
+def cards_to_ints(cards):
+    return [CARD_INDEX[card] for card in cards]
+
+def ints_to_cards(cards):
+    return [DECK[card] for card in cards]
+
+def card_rank(card):
+    """Rank index 0..12 ('2'..'Ace'); add 2 for the RANK_VALUES value."""
+    return card >> 2
+
+def card_suit(card):
+    return card & 3
+
+# Short notation like "As", "Td" or "10d" for command line tools
+SHORT_RANKS = '23456789TJQKA'
+SHORT_SUITS = 'schd'  # same order as SUITS
+
+def parse_card(text):
+    """Integer card for short notation ("As", "Td", "10d") or a full card string."""
+    if text in CARD_INDEX:
+        return CARD_INDEX[text]
+    rank, suit = text[:-1].upper(), text[-1].lower()
+    if rank == '10':
+        rank = 'T'
+    if len(rank) != 1 or rank not in SHORT_RANKS or suit not in SHORT_SUITS:
+        raise ValueError(f"Unknown card: {text!r}")
+    return SHORT_RANKS.index(rank) * 4 + SHORT_SUITS.index(suit)
+
+def parse_cards(text):
+    """Integer cards from concatenated short notation, e.g. "AsKd" or "2c 7d 9h"."""
+    text = text.replace(' ', '').replace(',', '')
+    cards = []
+    i = 0
+    while i < len(text):
+        size = 3 if text[i:i + 2] == '10' else 2
+        cards.append(parse_card(text[i:i + size]))
+        i += size
+    return cards
+
+def to_ints(cards):
+    """Integer cards from any mix of ints, full card strings and short notation."""
+    return [parse_card(card) if isinstance(card, str) else card for card in cards]
+
+def short_name(card):
+    return SHORT_RANKS[card >> 2] + SHORT_SUITS[card & 3]
+
+# Round tokens: the 9 cards of a round (player, dealer, community, in deal
+# order) as one number below 52*51*...*44, the position of each card among
+# the cards not dealt before it. That fits in 7 bytes, so the URL-safe
+# base64 token is 10 characters.
+ROUND_CARDS = 9  # 2 player, 2 dealer, 5 community
+ROUND_NUMBERS = perm(52, ROUND_CARDS)
+ROUND_TOKEN_BYTES = 7
+
+def round_number(cards):
+    """Number of 9 distinct integer cards in deal order; round_cards() reverses it."""
+    if len(cards) != ROUND_CARDS or len(set(cards)) != ROUND_CARDS:
+        raise ValueError(f"A round is {ROUND_CARDS} different cards")
+    remaining = list(range(52))
+    number = 0
+    for card in cards:
+        position = remaining.index(card)
+        number = number * len(remaining) + position
+        del remaining[position]
+    return number
+
+def round_cards(number):
+    """The 9 integer cards of a round_number()."""
+    positions = []
+    for size in range(52 - ROUND_CARDS + 1, 53):
+        number, position = divmod(number, size)
+        positions.append(position)
+    if number:
+        raise ValueError("Not a round number")
+    remaining = list(range(52))
+    return [remaining.pop(position) for position in reversed(positions)]
+
+def round_token(cards):
+    """Short URL-safe token for 9 integer cards, e.g. "AB3kq0Xz9Q"."""
+    data = round_number(cards).to_bytes(ROUND_TOKEN_BYTES, 'big')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def parse_round_token(token):
+    """The 9 integer cards of a round_token(); ValueError for anything else."""
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise ValueError(f"Not a round token: {token!r}")
+    number = int.from_bytes(data, 'big')
+    if len(data) != ROUND_TOKEN_BYTES or number >= ROUND_NUMBERS:
+        raise ValueError(f"Not a round token: {token!r}")
+    cards = round_cards(number)
+    if round_token(cards) != token:
+        raise ValueError(f"Not a round token: {token!r}")  # another spelling of the same bytes
+    return cards
@@ -0,0 +1,65 @@
+"""
+Card dealing for the practice games and simulators.
+
+A Dealer keeps one integer deck (see cards.py) and its own random stream.
+Each deal shuffles only the cards it hands out into place (a partial
+Fisher-Yates shuffle), so a round of 9 cards costs 9 random draws and no
+new deck. Since a Fisher-Yates pass is uniform from any starting order,
+the deck never needs resetting between deals.
+
+Dealers built with the same seed (and stream) deal the same cards, so a
+session or worker can be given its own reproducible stream:
+
+    Dealer(seed=42, stream=3)
+
+deal_many() pre-generates rounds in bulk into a NumPy array.
+"""
+
+import random
+import threading
+
+from cards import DECK, ROUND_CARDS
+
+class Dealer:
+    def __init__(self, seed=None, stream=None):
+        if seed is not None and stream is not None:
+            seed = f"{seed}:{stream}"
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._deck = list(range(52))
+        self._lock = threading.Lock()
+
+    def deal(self, count):
+        """`count` distinct random integer cards."""
+        deck = self._deck
+        rand = self._rng.random
+        with self._lock:
+            for i in range(count):
+                j = i + int(rand() * (52 - i))
+                deck[i], deck[j] = deck[j], deck[i]
+            return deck[:count]
+
+    def deal_round(self):
+        """(player_hand, dealer_hand, community_cards) as integer cards."""
+        return split_round(self.deal(ROUND_CARDS))
+
+    def deal_round_strings(self):
+        """A round as "Rank of Suit" strings, the way the games store it."""
+        cards = [DECK[card] for card in self.deal(ROUND_CARDS)]
+        return split_round(cards)
+
+    def deal_many(self, rounds, count=ROUND_CARDS):
+        """A (rounds, count) uint8 array of deals, each row distinct cards.
+
+        Seeded from this dealer's stream, so it is reproducible too.
+        Requires numpy.
+        """
+        import numpy as np
+        with self._lock:
+            seed = self._rng.getrandbits(128)
+        rng = np.random.default_rng(seed)
+        # Sorting random keys gives a uniform random permutation per row
+        return np.argsort(rng.random((rounds, 52)), axis=1)[:, :count].astype(np.uint8)
+
+def split_round(cards):
+    return cards[0:2], cards[2:4], cards[4:9]
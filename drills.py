@@ -0,0 +1,402 @@
+"""
+Deals for drilling one hand category at a time.
+
+Shuffling until a wanted hand shows up is hopeless for rare hands (about
+one 7-card hand in 3,200 is a straight flush), so these deals are built
+directly, uniformly over all 7-card hands of the requested category:
+
+- Without a flush, a hand's category only depends on its ranks. Every
+  multiset of 7 ranks is a pattern, weighted by the number of ways to
+  give its cards suits, the product of C(4, k) over ranks held k times.
+  A pattern is drawn by weight and its suits at random; the few suit
+  choices that make a flush are drawn again. Full houses and quads never
+  leave room for a flush.
+- With a flush, the category only depends on the ranks in the flush suit.
+  Every set F of 5 to 7 ranks is a pattern with weight 4 * C(39, 7 - |F|):
+  any suit, plus any 7 - |F| cards of the other three suits.
+
+The pattern tables are built on first use (a fraction of a second), after
+which a deal is a binary search and a handful of random draws.
+
+deal_drill() turns such a hand into a round: two of the seven cards are the
+player's, five the board, and the dealer's hole cards any of the 990 pairs
+left. Given the dealer's category too, the round is drawn uniformly from
+all rounds with both categories, again without drawing until one fits:
+
+- Boards are split into patterns by their ranks and by the ranks in their
+  flush suit, if three or more cards share one. All boards of a pattern
+  give every hole pair the same category, except that the pairs completing
+  the flush move to a flush category. Counting the player and dealer pairs
+  of each category and the cards they share gives the number of rounds for
+  each pattern exactly.
+- A pattern is drawn by that number, a board of it at random, then the
+  player's pair by the dealer pairs it leaves and one of those.
+
+Building the index of a pair takes a second or two on first use. Only a
+high card against a full house or four of a kind can never be dealt;
+parse_drill() refuses those up front.
+
+    python3 drills.py "Straight Flush" --vs Flush --count 5
+"""
+
+import argparse
+import bisect
+import random
+from array import array
+from functools import lru_cache
+from itertools import accumulate, combinations, combinations_with_replacement
+from math import comb
+
+from cards import DECK, HAND_OPTIONS
+from evaluator import (CATEGORY_SHIFT, FLUSH_TABLE, RANK_TABLE, board_sums, hand_category,
+                       strength_cards, strength_with_board)
+
+HAND_CARDS = 7
+BOARD_CARDS = 5
+FLUSH_CATEGORIES = (5, 8, 9)
+# High card against a full house or four of a kind, either way round: a high
+# card needs a board without a pair, and a full house or quads one with a pair
+NEVER_DEALT = {(0, 6), (6, 0), (0, 7), (7, 0)}
+
+_patterns = None  # category -> (patterns, cumulative weights)
+_POWERS = [5 ** r for r in range(13)]
+_BITS = bytes(bin(mask).count('1') for mask in range(1 << 13))
+# Category of a flush of the suited ranks in a mask of 5 or more ranks
+_FLUSH_CATEGORY = [0] * (1 << 13)
+for _mask, _result in FLUSH_TABLE.items():
+    _FLUSH_CATEGORY[_mask] = _result[0]
+
+def _build_patterns():
+    patterns = {category: [] for category in range(len(HAND_OPTIONS))}
+    weights = {category: [] for category in range(len(HAND_OPTIONS))}
+    powers = [5 ** r for r in range(13)]
+    for ranks in combinations_with_replacement(range(13), HAND_CARDS):
+        counts = [ranks.count(r) for r in set(ranks)]
+        if max(counts) > 4:
+            continue
+        category = RANK_TABLE[sum(powers[r] for r in ranks)][0]
+        weight = 1
+        for k in counts:
+            weight *= comb(4, k)
+        patterns[category].append(('ranks', ranks))
+        weights[category].append(weight)
+    for size in range(5, HAND_CARDS + 1):
+        for ranks in combinations(range(13), size):
+            mask = sum(1 << r for r in ranks)
+            category = FLUSH_TABLE[mask][0]
+            patterns[category].append(('flush', ranks))
+            weights[category].append(4 * comb(39, HAND_CARDS - size))
+    return {category: (patterns[category], list(accumulate(weights[category])))
+            for category in patterns}
+
+def _tables():
+    global _patterns
+    if _patterns is None:
+        _patterns = _build_patterns()
+    return _patterns
+
+def _deal_ranks(ranks, rng):
+    """Suits for a rank pattern; None when they happen to make a flush."""
+    cards = []
+    suits_used = [0, 0, 0, 0]
+    start = 0
+    while start < len(ranks):
+        end = start
+        while end < len(ranks) and ranks[end] == ranks[start]:
+            end += 1
+        for suit in rng.sample(range(4), end - start):
+            cards.append(ranks[start] * 4 + suit)
+            suits_used[suit] += 1
+        start = end
+    if max(suits_used) >= 5:
+        return None
+    return cards
+
+def _deal_flush(ranks, rng):
+    suit = rng.randrange(4)
+    cards = [rank * 4 + suit for rank in ranks]
+    others = [card for card in range(52) if card & 3 != suit]
+    return cards + rng.sample(others, HAND_CARDS - len(ranks))
+
+def deal_category(category, rng=random):
+    """A uniformly random 7-card hand (integer cards, in random order) of the category."""
+    patterns, cumulative = _tables()[category]
+    total = cumulative[-1]
+    while True:
+        kind, ranks = patterns[bisect.bisect_right(cumulative, rng.randrange(total))]
+        cards = _deal_flush(ranks, rng) if kind == 'flush' else _deal_ranks(ranks, rng)
+        if cards is not None:
+            rng.shuffle(cards)
+            return cards
+
+# --- Rounds with both categories ---
+
+@lru_cache(maxsize=1)
+def _board_ranks():
+    return [ranks for ranks in combinations_with_replacement(range(13), BOARD_CARDS) if ranks[0] != ranks[4]]
+
+@lru_cache(maxsize=None)
+def _rank_pairs(ranks):
+    """(partners, per_card) for hole pairs next to board ranks without a flush.
+
+    Their category then only depends on their ranks. At category * 13 + r,
+    partners has the mask of ranks pairing with rank r into the category,
+    bit r for a pocket pair, and per_card the hole pairs each card of rank
+    r left is in.
+    """
+    left = [4 - ranks.count(r) for r in range(13)]
+    key = sum(_POWERS[r] for r in ranks)
+    partners = array('H', bytes(2 * 13 * len(HAND_OPTIONS)))
+    per_card = bytearray(13 * len(HAND_OPTIONS))
+    for r1 in range(13):
+        for r2 in range(r1, 13):
+            if r1 == r2:
+                if left[r1] > 1:
+                    row = RANK_TABLE[key + 2 * _POWERS[r1]][0] * 13
+                    partners[row + r1] |= 1 << r1
+                    per_card[row + r1] += left[r1] - 1
+            elif left[r1] and left[r2]:
+                row = RANK_TABLE[key + _POWERS[r1] + _POWERS[r2]][0] * 13
+                partners[row + r1] |= 1 << r2
+                partners[row + r2] |= 1 << r1
+                per_card[row + r1] += left[r2]
+                per_card[row + r2] += left[r1]
+    return partners, bytes(per_card)
+
+@lru_cache(maxsize=None)
+def _flush_pairs(mask):
+    # For a board whose flush suit holds the ranks in mask: per flush category,
+    # (pairs, per suited card, per other card) counting the hole pairs that
+    # complete that flush in all, held by the suited card of each rank left,
+    # and held by each card of the other suits
+    size = _BITS[mask]
+    free = [r for r in range(13) if not mask >> r & 1]
+    others = 52 - BOARD_CARDS - len(free)  # cards of the other suits left
+    suited = {c: [0] * 13 for c in FLUSH_CATEGORIES}
+    other = dict.fromkeys(FLUSH_CATEGORIES, 0)
+    for r1 in free:
+        for r2 in free:
+            if r2 != r1:
+                suited[_FLUSH_CATEGORY[mask | 1 << r1 | 1 << r2]][r1] += 1
+        if size >= 4:
+            c = _FLUSH_CATEGORY[mask | 1 << r1]
+            suited[c][r1] += others
+            other[c] += 1
+    if size == 5:
+        other[_FLUSH_CATEGORY[mask]] += others - 1
+    return {c: ((sum(suited[c]) + others * other[c]) // 2, suited[c], [other[c]] * 13)
+            for c in FLUSH_CATEGORIES}
+
+def _pattern_weights(ranks, player, dealer):
+    """[(flush mask, rounds)] for the boards with these ranks.
+
+    Boards are split by the ranks they hold in their flush suit, the one
+    suit holding three or more of them, or mask 0 when there is none. rounds
+    is the number of boards of the pattern times the player and dealer hole
+    pairs of the two categories that share no card.
+    """
+    left = [4] * 13
+    for r in ranks:
+        left[r] -= 1
+    partners, per_card = _rank_pairs(ranks)
+    none = [0] * 13
+    plain = {}  # category -> (pairs, per card, partner ranks) without a flush
+    for c in {player, dealer}:
+        held = list(per_card[c * 13:c * 13 + 13])
+        plain[c] = (sum(left[r] * held[r] for r in range(13)) // 2, held, partners[c * 13:c * 13 + 13])
+        if not plain[c][0] and c not in FLUSH_CATEGORIES:
+            return []  # a flush only takes hole pairs away from the other categories
+
+    def cells(c, mask, size):
+        # (pairs, per suited card, per other card) of category c on the boards
+        # of the pattern: the hole pairs with two suited cards complete the
+        # flush, and from four suited cards on the board so do those with one
+        if c in FLUSH_CATEGORIES:
+            return _flush_pairs(mask)[c]
+        if size == 5:
+            return 0, none, none
+        pairs, held, ranks_with = plain[c]
+        free = ~mask & 0x1fff
+        lost = 0
+        per_suited = none[:]
+        for r in range(13):
+            if free >> r & 1:
+                both_suited = _BITS[ranks_with[r] & free & ~(1 << r)]
+                lost += both_suited
+                per_suited[r] = held[r] - both_suited
+        if size == 3:
+            return pairs - lost // 2, per_suited, held
+        per_other = [held[r] - _BITS[ranks_with[r] & free] for r in range(13)]
+        return pairs - sum(per_suited) - lost // 2, none, per_other
+
+    def rounds(boards, player_cells, dealer_cells, other_cards):
+        # other_cards: cards of each rank left outside the flush suit
+        p_pairs, p_suited, p_other = player_cells
+        d_pairs, d_suited, d_other = dealer_cells
+        if not boards or not p_pairs or not d_pairs:
+            return 0
+        shared = 0
+        for r in range(13):
+            shared += p_suited[r] * d_suited[r] + other_cards[r] * p_other[r] * d_other[r]
+        both = p_pairs * d_pairs - shared
+        if player == dealer:
+            both += p_pairs  # each pair shares both its cards with itself
+        return boards * both
+
+    patterns = []
+    plain_boards = 1
+    for r in range(13):
+        plain_boards *= comb(4, 4 - left[r])
+    distinct = sorted(set(ranks))
+    for size in range(3, len(distinct) + 1):
+        for suited in combinations(distinct, size):
+            boards = 4
+            for r in distinct:
+                boards *= comb(3, 4 - left[r] - (r in suited))
+            if not boards:
+                continue
+            plain_boards -= boards
+            mask = 0
+            for r in suited:
+                mask |= 1 << r
+            weight = rounds(boards, cells(player, mask, size), cells(dealer, mask, size),
+                            [left[r] - (not mask >> r & 1) for r in range(13)])
+            if weight:
+                patterns.append((mask, weight))
+    weight = rounds(plain_boards, (plain[player][0], none, plain[player][1]),
+                    (plain[dealer][0], none, plain[dealer][1]), left)
+    if weight:
+        patterns.append((0, weight))
+    return patterns
+
+@lru_cache(maxsize=None)
+def _round_index(player, dealer):
+    # (board rank multisets, cumulative rounds); the same for both orders of the pair
+    boards = []
+    cumulative = []
+    total = 0
+    for ranks in _board_ranks():
+        weight = sum(weight for _, weight in _pattern_weights(ranks, player, dealer))
+        if weight:
+            total += weight
+            boards.append(ranks)
+            cumulative.append(total)
+    return boards, cumulative
+
+def _deal_board(ranks, mask, rng):
+    """Board cards for the ranks, holding those in mask in one suit and no
+    other three cards of a suit."""
+    while True:
+        if mask:
+            flush_suit = rng.randrange(4)
+            other_suits = [suit for suit in range(4) if suit != flush_suit]
+        else:
+            other_suits = range(4)
+        cards = []
+        suits_used = [0, 0, 0, 0]
+        for r in sorted(set(ranks)):
+            count = ranks.count(r)
+            if mask >> r & 1:
+                cards.append(r * 4 + flush_suit)
+                count -= 1
+            for suit in rng.sample(other_suits, count):
+                cards.append(r * 4 + suit)
+                suits_used[suit] += 1
+        # Without a flush suit the few suit choices that make one are drawn again
+        if mask or max(suits_used) < 3:
+            return cards
+
+def deal_drill(player_category, dealer_category=None, rng=random):
+    """(player_hand, dealer_hand, community_cards) as integer cards.
+
+    The player's best hand is of player_category. The dealer's hole cards
+    are uniform over all pairs left; with a dealer_category the round is
+    uniform over all rounds where both hands are of their categories.
+    """
+    if dealer_category is None:
+        hand = deal_category(player_category, rng)
+        player_hand, community_cards = hand[:2], hand[2:]
+        used = set(hand)
+        left = [card for card in range(52) if card not in used]
+        return player_hand, rng.sample(left, 2), community_cards
+    if not drill_possible(player_category, dealer_category):
+        raise ValueError(f"{HAND_OPTIONS[player_category]} cannot be dealt against {HAND_OPTIONS[dealer_category]}")
+    boards, cumulative = _round_index(min(player_category, dealer_category),
+                                      max(player_category, dealer_category))
+    ranks = boards[bisect.bisect_right(cumulative, rng.randrange(cumulative[-1]))]
+    masks, weights = zip(*_pattern_weights(ranks, player_category, dealer_category))
+    cumulative = list(accumulate(weights))
+    mask = masks[bisect.bisect_right(cumulative, rng.randrange(cumulative[-1]))]
+    community_cards = _deal_board(ranks, mask, rng)
+    sums = board_sums(community_cards)
+    left = [card for card in range(52) if card not in community_cards]
+    player_pairs = []
+    dealer_pairs = []
+    for pair in combinations(left, 2):
+        category = strength_with_board(pair, community_cards, sums) >> CATEGORY_SHIFT
+        if category == player_category:
+            player_pairs.append(pair)
+        if category == dealer_category:
+            dealer_pairs.append(pair)
+    # A player pair is drawn by the number of dealer pairs it leaves, then one of those
+    dealer_holding = [0] * 52
+    for a, b in dealer_pairs:
+        dealer_holding[a] += 1
+        dealer_holding[b] += 1
+    same = player_category == dealer_category
+    weights = [len(dealer_pairs) - dealer_holding[a] - dealer_holding[b] + same for a, b in player_pairs]
+    player_hand = list(rng.choices(player_pairs, weights)[0])
+    dealer_hand = list(rng.choice([pair for pair in dealer_pairs if not set(pair) & set(player_hand)]))
+    rng.shuffle(player_hand)
+    rng.shuffle(dealer_hand)
+    rng.shuffle(community_cards)
+    return player_hand, dealer_hand, community_cards
+
+def parse_category(text):
+    """Category number from a name like "full house" or "Full-House", or its number."""
+    if text.isdigit() and int(text) < len(HAND_OPTIONS):
+        return int(text)
+    names = [name.lower() for name in HAND_OPTIONS]
+    name = text.lower().replace('-', ' ').replace('_', ' ')
+    if name not in names:
+        raise ValueError(f"Unknown hand category {text!r}; one of: {', '.join(HAND_OPTIONS)}")
+    return names.index(name)
+
+def drill_possible(player_category, dealer_category=None):
+    """Whether deal_drill() can deal this pair."""
+    return (player_category, dealer_category) not in NEVER_DEALT
+
+def parse_drill(category, vs=None):
+    """(player category, dealer category or None) for names like parse_category() takes.
+
+    Raises ValueError for unknown names and for pairs that cannot be dealt.
+    """
+    player_category = parse_category(category)
+    dealer_category = parse_category(vs) if vs else None
+    if not drill_possible(player_category, dealer_category):
+        raise ValueError(f"{HAND_OPTIONS[player_category]} cannot be dealt against {HAND_OPTIONS[dealer_category]}")
+    return player_category, dealer_category
+
+def main():
+    parser = argparse.ArgumentParser(description="Deal rounds where the player holds a chosen hand.")
+    parser.add_argument('category', help="e.g. 'Full House' or 6")
+    parser.add_argument('--vs', default=None, help="the dealer's hand category")
+    parser.add_argument('--count', type=int, default=5)
+    parser.add_argument('--seed', default=None)
+    args = parser.parse_args()
+
+    try:
+        player_category, dealer_category = parse_drill(args.category, args.vs)
+    except ValueError as e:
+        parser.error(str(e))
+    rng = random.Random(args.seed)
+    for _ in range(args.count):
+        player_hand, dealer_hand, community_cards = deal_drill(player_category, dealer_category, rng)
+        player = HAND_OPTIONS[hand_category(strength_cards(player_hand + community_cards))]
+        dealer = HAND_OPTIONS[hand_category(strength_cards(dealer_hand + community_cards))]
+        print(f"Board {', '.join(DECK[c] for c in community_cards)}")
+        print(f"  Player {', '.join(DECK[c] for c in player_hand)}: {player}")
+        print(f"  Dealer {', '.join(DECK[c] for c in dealer_hand)}: {dealer}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Monte Carlo equity for the player against the dealer.
+
+Given both hole cards and 0, 3 or 4 known community cards, deals the rest
+of the board at random many times and counts how often the player wins,
+ties or loses. Batches of boards are evaluated with the NumPy batch
+evaluator and spread over a process pool. Every batch gets its own RNG
+stream spawned from one SeedSequence, so a seeded run is reproducible no
+matter which worker picks up which batch.
+
+The run stops at the first of: the requested number of samples, the
+time budget, or the 95% confidence interval of the equity shrinking to
+the target half-width.
+
+Usage:
+    python3 equity.py AsKs QdQh
+    python3 equity.py AsKs QdQh --board 2c7d9h --workers 4 --ci 0.002
+
+Requires numpy.
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from batch_eval import random_boards, strength_batch
+from cards import parse_cards, to_ints
+
+BATCH_SIZE = 20000
+Z_95 = 1.96
+
+def _check_cards(player_hand, dealer_hand, community_cards):
+    known = player_hand + dealer_hand + community_cards
+    if len(player_hand) != 2 or len(dealer_hand) != 2:
+        raise ValueError("Player and dealer need exactly two hole cards each")
+    if len(community_cards) > 5:
+        raise ValueError("At most five community cards")
+    if len(set(known)) != len(known):
+        raise ValueError("The same card appears twice")
+
+def simulate_batch(player_hand, dealer_hand, community_cards, count, seed_seq):
+    """Deal `count` random completions of the board; return (wins, ties, count)."""
+    rng = np.random.default_rng(seed_seq)
+    boards = random_boards(community_cards, player_hand + dealer_hand, count, rng)
+    player = strength_batch(np.hstack([np.tile(np.array(player_hand, dtype=np.uint8), (count, 1)), boards]))
+    dealer = strength_batch(np.hstack([np.tile(np.array(dealer_hand, dtype=np.uint8), (count, 1)), boards]))
+    return int((player > dealer).sum()), int((player == dealer).sum()), count
+
+def confidence_interval(wins, ties, samples):
+    """95% half-width of the equity estimate."""
+    win = wins / samples
+    tie = ties / samples
+    equity = win + tie / 2
+    # Each sample scores 1, 1/2 or 0 for the player
+    variance = max(win + tie / 4 - equity * equity, 0.0)
+    return Z_95 * math.sqrt(variance / samples)
+
+def _summary(wins, ties, samples, elapsed, workers):
+    win = wins / samples
+    tie = ties / samples
+    return {
+        'win': win,
+        'tie': tie,
+        'loss': 1.0 - win - tie,
+        'equity': win + tie / 2,
+        'ci': confidence_interval(wins, ties, samples),
+        'samples': samples,
+        'elapsed': elapsed,
+        'samples_per_sec': samples / elapsed if elapsed > 0 else float('inf'),
+        'workers': workers,
+    }
+
+def monte_carlo_equity(player_hand, dealer_hand, community_cards=(), samples=1_000_000,
+                       workers=None, seed=None, target_ci=None, time_budget=None,
+                       batch_size=BATCH_SIZE):
+    """Estimate the player's win/tie/loss odds against the dealer.
+
+    Cards can be "Rank of Suit" strings, short notation ("As") or ints.
+    workers defaults to every CPU; 1 runs in this process. target_ci is the
+    wanted 95% half-width of the equity and time_budget is in seconds.
+    Returns a dict with win, tie, loss, equity, ci, samples, elapsed,
+    samples_per_sec and workers.
+    """
+    player_hand = to_ints(player_hand)
+    dealer_hand = to_ints(dealer_hand)
+    community_cards = to_ints(community_cards)
+    _check_cards(player_hand, dealer_hand, community_cards)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    if len(community_cards) == 5:
+        wins, ties, count = simulate_batch(player_hand, dealer_hand, community_cards, 1, None)
+        return _summary(wins, ties, count, time.perf_counter() - start, 1)
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+
+    seeds = np.random.SeedSequence(seed)
+    sizes = [batch_size] * (samples // batch_size)
+    if samples % batch_size:
+        sizes.append(samples % batch_size)
+    wins = ties = done = 0
+
+    def finished():
+        if done >= samples:
+            return True
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            return True
+        if target_ci is not None and done:
+            return confidence_interval(wins, ties, done) <= target_ci
+        return False
+
+    if workers == 1:
+        for size in sizes:
+            w, t, n = simulate_batch(player_hand, dealer_hand, community_cards, size, seeds.spawn(1)[0])
+            wins, ties, done = wins + w, ties + t, done + n
+            if finished():
+                break
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            pending = set()
+            next_batch = 0
+            while True:
+                # Keep every worker busy with one batch queued behind it
+                while next_batch < len(sizes) and len(pending) < 2 * workers:
+                    pending.add(pool.submit(simulate_batch, player_hand, dealer_hand, community_cards,
+                                            sizes[next_batch], seeds.spawn(1)[0]))
+                    next_batch += 1
+                if not pending:
+                    break
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    w, t, n = future.result()
+                    wins, ties, done = wins + w, ties + t, done + n
+                if finished():
+                    for future in pending:
+                        future.cancel()
+                    break
+
+    return _summary(wins, ties, done, time.perf_counter() - start, workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo equity of the player against the dealer.")
+    parser.add_argument('player', help="player hole cards, e.g. AsKs")
+    parser.add_argument('dealer', help="dealer hole cards, e.g. QdQh")
+    parser.add_argument('--board', default='', help="known community cards, e.g. 2c7d9h")
+    parser.add_argument('--samples', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--ci', type=float, default=None, help="stop at this 95%% half-width")
+    parser.add_argument('--time', type=float, default=None, help="time budget in seconds")
+    args = parser.parse_args()
+
+    result = monte_carlo_equity(parse_cards(args.player), parse_cards(args.dealer), parse_cards(args.board),
+                                samples=args.samples, workers=args.workers, seed=args.seed,
+                                target_ci=args.ci, time_budget=args.time)
+    print(f"Player wins: {result['win']:7.2%}")
+    print(f"Tie:         {result['tie']:7.2%}")
+    print(f"Dealer wins: {result['loss']:7.2%}")
+    print(f"Equity:      {result['equity']:7.2%} +/- {result['ci']:.2%}")
+    print(f"{result['samples']} samples in {result['elapsed']:.2f}s "
+          f"({result['samples_per_sec']:,.0f} samples/sec on {result['workers']} workers)")
+
+if __name__ == "__main__":
+    main()
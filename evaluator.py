@@ -0,0 +1,463 @@
+"""
+Lookup-table hand evaluator for 5 to 7 cards.
+
+evaluate_hand_reference() is the original string-parsing evaluator from
+practice.py. It is kept as the source of truth for the hand semantics and
+for cross-checking.
+
+The fast path works on integer cards (see cards.py) and never parses a
+string or builds a Counter:
+
+* Every card contributes 5**rank to a "rank key". Since no rank appears
+  more than 4 times the key is a perfect hash of the rank multiset, and
+  RANK_TABLE maps it straight to the answer for hands without a flush.
+* Every card adds 1 to a 4-bit counter for its suit. The counters start
+  at 3, so bit 3 of a counter is set exactly when its suit has 5 or more
+  cards. That tells us whether there is a flush and in which suit.
+* For a flush, the ranks of the flush suit form a 13-bit mask and
+  FLUSH_TABLE maps the mask to the answer.
+
+With 7 cards or fewer a flush can never coexist with four of a kind or a
+full house, so the flush answer is always the final one.
+
+Both tables return the same (category, [ranks]) results as
+evaluate_hand_reference(). Parallel tables hold packed integer strengths
+(see pack_strength()) for code that only needs to rank hands, and
+best_five() says which of the cards those are.
+"""
+
+from collections import Counter
+from functools import lru_cache
+from itertools import combinations_with_replacement, groupby
+
+from cards import CARD_INDEX, DECK, RANK_VALUES
+
+def card_value(card):
+    rank, _, suit = card.partition(" of ")
+    return rank, suit
+
+def rank_value(rank):
+    return RANK_VALUES[rank]
+
+def evaluate_hand_reference(cards):
+    ranks = []
+    suits = []
+    for card in cards:
+        r, s = card_value(card)
+        ranks.append(r)
+        suits.append(s)
+    rank_counts = Counter(ranks)
+    suit_counts = Counter(suits)
+    rank_nums = sorted([rank_value(r) for r in ranks], reverse=True)
+    flush_suit = None
+    for suit, count in suit_counts.items():
+        if count >= 5:
+            flush_suit = suit
+            break
+    flush_cards = []
+    if flush_suit:
+        flush_cards = [rank_value(r) for r, s in zip(ranks, suits) if s == flush_suit]
+        flush_cards.sort(reverse=True)
+    unique_rank_nums = sorted(set(rank_nums), reverse=True)
+
+    def is_straight(vals):
+        for i in range(len(vals) - 4):
+            window = vals[i:i+5]
+            if window[0] - window[4] == 4:
+                return window[0]
+        if set([14, 5, 4, 3, 2]).issubset(set(vals)):
+            return 5
+        return None
+
+    straight_flush_high = None
+    if flush_suit:
+        sf_high = is_straight(flush_cards)
+        if sf_high:
+            straight_flush_high = sf_high
+
+    fours = [r for r, c in rank_counts.items() if c == 4]
+    threes = [r for r, c in rank_counts.items() if c == 3]
+    pairs = [r for r, c in rank_counts.items() if c == 2]
+
+    if straight_flush_high == 14:
+        return (9, [14])
+    if straight_flush_high:
+        return (8, [straight_flush_high])
+    if fours:
+        quad_rank = max([rank_value(r) for r in fours])
+        kickers = [r for r in rank_nums if r != quad_rank]
+        return (7, [quad_rank] + kickers)
+    if threes and (pairs or len(threes) > 1):
+        trip_rank = max([rank_value(r) for r in threes])
+        if len(threes) > 1:
+            pair_rank = max([rank_value(r) for r in threes if rank_value(r) != trip_rank])
+        else:
+            pair_rank = max([rank_value(r) for r in pairs]) if pairs else 0
+        return (6, [trip_rank, pair_rank])
+    if flush_suit:
+        top5 = flush_cards[:5]
+        return (5, top5)
+    straight_high = is_straight(unique_rank_nums)
+    if straight_high:
+        return (4, [straight_high])
+    if threes:
+        trip_rank = max([rank_value(r) for r in threes])
+        kickers = [r for r in rank_nums if r != trip_rank][:2]
+        return (3, [trip_rank] + kickers)
+    if len(pairs) >= 2:
+        top_pairs = sorted([rank_value(r) for r in pairs], reverse=True)[:2]
+        kicker = max([r for r in rank_nums if r not in top_pairs])
+        return (2, top_pairs + [kicker])
+    if pairs:
+        pair_rank = max([rank_value(r) for r in pairs])
+        kickers = [r for r in rank_nums if r != pair_rank][:3]
+        return (1, [pair_rank] + kickers)
+    return (0, rank_nums[:5])
+
+# --- Lookup tables ---
+
+MIN_CARDS = 5
+MAX_CARDS = 7
+
+RANK_KEY = [5 ** (card >> 2) for card in range(52)]
+SUIT_KEY = [1 << (4 * (card & 3)) for card in range(52)]
+RANK_BIT = [1 << (card >> 2) for card in range(52)]
+SUIT_START = 0x3333
+FLUSH_BITS = 0x8888
+# bit 3 of suit counter s -> suit index s
+FLUSH_SUIT = {8 << (4 * s): s for s in range(4)}
+
+WHEEL_MASK = (1 << 12) | 0b1111
+
+def _straight_high(mask):
+    for low in range(8, -1, -1):
+        window = 0b11111 << low
+        if mask & window == window:
+            return low + 6
+    if mask & WHEEL_MASK == WHEEL_MASK:
+        return 5
+    return 0
+
+def _mask_values(mask):
+    # rank values (2..14) present in a 13-bit mask, highest first
+    return [r + 2 for r in range(12, -1, -1) if mask >> r & 1]
+
+STRAIGHT_HIGH = [_straight_high(mask) for mask in range(1 << 13)]
+
+def _flush_result(mask):
+    high = STRAIGHT_HIGH[mask]
+    if high == 14:
+        return (9, (14,))
+    if high:
+        return (8, (high,))
+    return (5, tuple(_mask_values(mask)[:5]))
+
+def _rank_result(rank_nums):
+    # Same decision order as evaluate_hand_reference() without the flush
+    # branches; rank_nums holds the rank values sorted highest first.
+    fours = []
+    threes = []
+    pairs = []
+    mask = 0
+    for value, group in groupby(rank_nums):
+        mask |= 1 << (value - 2)
+        count = len(list(group))
+        if count == 4:
+            fours.append(value)
+        elif count == 3:
+            threes.append(value)
+        elif count == 2:
+            pairs.append(value)
+    if fours:
+        quad_rank = fours[0]
+        return (7, tuple([quad_rank] + [r for r in rank_nums if r != quad_rank]))
+    if threes and (pairs or len(threes) > 1):
+        if len(threes) > 1:
+            return (6, (threes[0], threes[1]))
+        return (6, (threes[0], pairs[0]))
+    straight_high = STRAIGHT_HIGH[mask]
+    if straight_high:
+        return (4, (straight_high,))
+    if threes:
+        trip_rank = threes[0]
+        return (3, tuple([trip_rank] + [r for r in rank_nums if r != trip_rank][:2]))
+    if len(pairs) >= 2:
+        top_pairs = pairs[:2]
+        kicker = max([r for r in rank_nums if r not in top_pairs])
+        return (2, tuple(top_pairs + [kicker]))
+    if pairs:
+        pair_rank = pairs[0]
+        return (1, tuple([pair_rank] + [r for r in rank_nums if r != pair_rank][:3]))
+    return (0, tuple(rank_nums[:5]))
+
+def _build_tables():
+    flush_table = {}
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= MIN_CARDS:
+            flush_table[mask] = _flush_result(mask)
+    rank_table = {}
+    powers = [5 ** r for r in range(13)]
+    for size in range(MIN_CARDS, MAX_CARDS + 1):
+        # non-increasing rank sequences, i.e. every rank multiset of this size
+        for ranks in combinations_with_replacement(range(12, -1, -1), size):
+            if any(ranks[i] == ranks[i + 4] for i in range(size - 4)):
+                continue  # five of a rank
+            key = 0
+            for r in ranks:
+                key += powers[r]
+            rank_nums = [r + 2 for r in ranks]
+            rank_table[key] = _rank_result(rank_nums)
+    return flush_table, rank_table
+
+FLUSH_TABLE, RANK_TABLE = _build_tables()
+
+# --- Packed strengths ---
+#
+# A strength is one int: category << 20 followed by the ranks of the five
+# cards that play, 4 bits each, in the order they matter. Comparing two
+# strengths with > or == is the whole showdown.
+
+CATEGORY_SHIFT = 20
+
+def _five_ranks(category, ranks):
+    if category in (9, 8, 4):
+        high = ranks[0]
+        return [high, high - 1, high - 2, high - 3, high - 4]  # the wheel ends in 1
+    if category == 7:
+        return [ranks[0]] * 4 + [ranks[1]]
+    if category == 6:
+        return [ranks[0]] * 3 + [ranks[1]] * 2
+    if category == 3:
+        return [ranks[0]] * 3 + list(ranks[1:3])
+    if category == 2:
+        return [ranks[0]] * 2 + [ranks[1]] * 2 + [ranks[2]]
+    if category == 1:
+        return [ranks[0]] * 2 + list(ranks[1:4])
+    return list(ranks[:5])
+
+def pack_strength(category, ranks):
+    """Packed strength for a (category, ranks) result of evaluate_hand().
+
+    Only the five cards that play count, so four of a kind keeps a single
+    kicker where the ranks list carries every leftover card.
+    """
+    strength = category
+    for rank in _five_ranks(category, ranks):
+        strength = strength << 4 | rank
+    return strength
+
+def hand_category(strength):
+    return strength >> CATEGORY_SHIFT
+
+def strength_ranks(strength):
+    """Ranks (2..14, 1 for a low ace) of the five cards that play."""
+    return [strength >> shift & 0xF for shift in (16, 12, 8, 4, 0)]
+
+FLUSH_STRENGTH = [0] * (1 << 13)
+for _mask, _result in FLUSH_TABLE.items():
+    FLUSH_STRENGTH[_mask] = pack_strength(*_result)
+RANK_STRENGTH = {key: pack_strength(*result) for key, result in RANK_TABLE.items()}
+del _mask, _result
+
+# --- Evaluation ---
+
+def lookup(cards):
+    """Table entry (category, ranks tuple) for 5 to 7 integer cards.
+
+    The tuple is shared between calls, so callers must not modify it.
+    """
+    key = 0
+    suits = SUIT_START
+    for card in cards:
+        key += RANK_KEY[card]
+        suits += SUIT_KEY[card]
+    flush = suits & FLUSH_BITS
+    if flush:
+        suit = FLUSH_SUIT[flush]
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= RANK_BIT[card]
+        return FLUSH_TABLE[mask]
+    return RANK_TABLE[key]
+
+def evaluate_cards(cards):
+    """Evaluate integer cards; same result as evaluate_hand_reference()."""
+    if not MIN_CARDS <= len(cards) <= MAX_CARDS:
+        return evaluate_hand_reference([DECK[card] for card in cards])
+    category, ranks = lookup(cards)
+    return (category, list(ranks))
+
+def evaluate_hand(cards):
+    """Evaluate "Rank of Suit" card strings through the lookup tables."""
+    return evaluate_cards([CARD_INDEX[card] for card in cards])
+
+def strength_cards(cards):
+    """Packed strength for 5 to 7 integer cards."""
+    # Same walk as lookup(), kept inline because this is the hot path
+    key = 0
+    suits = SUIT_START
+    for card in cards:
+        key += RANK_KEY[card]
+        suits += SUIT_KEY[card]
+    flush = suits & FLUSH_BITS
+    if flush:
+        suit = FLUSH_SUIT[flush]
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= RANK_BIT[card]
+        return FLUSH_STRENGTH[mask]
+    return RANK_STRENGTH[key]
+
+def board_sums(board):
+    """(rank key, suit counters) of shared cards, for strength_with_board()."""
+    key = 0
+    suits = SUIT_START
+    for card in board:
+        key += RANK_KEY[card]
+        suits += SUIT_KEY[card]
+    return key, suits
+
+def strength_with_board(hole, board, sums):
+    """strength_cards(hole + board), reusing the board's precomputed sums.
+
+    Saves re-walking the board for every seat when many hands share it.
+    """
+    key, suits = sums
+    for card in hole:
+        key += RANK_KEY[card]
+        suits += SUIT_KEY[card]
+    flush = suits & FLUSH_BITS
+    if flush:
+        suit = FLUSH_SUIT[flush]
+        mask = 0
+        for card in hole:
+            if card & 3 == suit:
+                mask |= RANK_BIT[card]
+        for card in board:
+            if card & 3 == suit:
+                mask |= RANK_BIT[card]
+        return FLUSH_STRENGTH[mask]
+    return RANK_STRENGTH[key]
+
+# --- Best five cards ---
+#
+# The packed strength already names the ranks of the five cards that play,
+# so finding the cards only needs those ranks (in the flush suit for a
+# flush) picked out of the hand. How many of the five make the hand and
+# how many are kickers depends on the category alone.
+
+MADE_CARDS = [1, 2, 4, 3, 5, 5, 5, 4, 5, 5]  # by category; the rest of the five are kickers
+
+@lru_cache(maxsize=None)
+def _five_plan(strength):
+    # ((rank 0..12, cards of that rank, kicker?), ...) in the order they play
+    made = MADE_CARDS[strength >> CATEGORY_SHIFT]
+    plan = []
+    for position, rank in enumerate(strength_ranks(strength)):
+        rank = (rank - 2) % 13  # the wheel's low ace is rank 12 too
+        if plan and plan[-1][0] == rank:
+            plan[-1][1] += 1
+        else:
+            plan.append([rank, 1, position >= made])
+    return tuple(tuple(step) for step in plan)
+
+def best_five(cards):
+    """(strength, used, kickers) for 5 to 7 integer cards.
+
+    used holds the indexes into cards of the five that play, in the order
+    they count; kickers the ones among them that only break ties. Of two
+    equal cards that could play, the first one in cards is used.
+    """
+    key = 0
+    suits = SUIT_START
+    for card in cards:
+        key += RANK_KEY[card]
+        suits += SUIT_KEY[card]
+    flush = suits & FLUSH_BITS
+    suit = None
+    if flush:
+        suit = FLUSH_SUIT[flush]
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= RANK_BIT[card]
+        strength = FLUSH_STRENGTH[mask]
+    else:
+        strength = RANK_STRENGTH[key]
+    used = []
+    kickers = []
+    for rank, count, kicker in _five_plan(strength):
+        for index, card in enumerate(cards):
+            if card >> 2 == rank and (suit is None or card & 3 == suit):
+                used.append(index)
+                if kicker:
+                    kickers.append(index)
+                count -= 1
+                if not count:
+                    break
+    return strength, used, kickers
+
+# --- Incremental evaluation ---
+
+class HandState:
+    """Rank key, suit counters and per-suit rank masks of a growing hand.
+
+    add() returns the state with one more card without re-walking the
+    cards already in it, so a flop state extends to every turn card and a
+    turn state to every river card. strength() needs 5 to 7 cards.
+    """
+    __slots__ = ('key', 'suits', 'masks')
+
+    def __init__(self, key=0, suits=SUIT_START, masks=(0, 0, 0, 0)):
+        self.key = key
+        self.suits = suits
+        self.masks = masks
+
+    @classmethod
+    def from_cards(cls, cards):
+        state = cls()
+        for card in cards:
+            state = state.add(card)
+        return state
+
+    def add(self, card):
+        masks = list(self.masks)
+        masks[card & 3] |= RANK_BIT[card]
+        return HandState(self.key + RANK_KEY[card], self.suits + SUIT_KEY[card], tuple(masks))
+
+    def strength(self):
+        flush = self.suits & FLUSH_BITS
+        if flush:
+            return FLUSH_STRENGTH[self.masks[FLUSH_SUIT[flush]]]
+        return RANK_STRENGTH[self.key]
+
+def hand_strength(cards):
+    """Packed strength for "Rank of Suit" card strings."""
+    return strength_cards([CARD_INDEX[card] for card in cards])
+
+def hand_best_five(cards):
+    """best_five() for "Rank of Suit" card strings."""
+    return best_five([CARD_INDEX[card] for card in cards])
+
+def compare_strengths(player_strength, dealer_strength):
+    if player_strength > dealer_strength:
+        return "player"
+    elif player_strength < dealer_strength:
+        return "dealer"
+    return "tie"
+
+def compare_hands(player_hand_rank, dealer_hand_rank):
+    """Compare two evaluate_hand() results the way the games originally did."""
+    if player_hand_rank[0] > dealer_hand_rank[0]:
+        return "player"
+    elif player_hand_rank[0] < dealer_hand_rank[0]:
+        return "dealer"
+    else:
+        for p_val, d_val in zip(player_hand_rank[1], dealer_hand_rank[1]):
+            if p_val > d_val:
+                return "player"
+            elif p_val < d_val:
+                return "dealer"
+        return "tie"
@@ -0,0 +1,83 @@
+"""
+Exact player vs dealer equity on the flop, turn and river.
+
+Once three community cards are known there are few enough ways to finish
+the board (990 on the flop, 44 on the turn) to try them all instead of
+sampling. Swapping suits around never changes the odds, so each spot is
+first rewritten in a canonical form: the smallest relabelling of the
+cards over all 24 suit permutations. Equivalent spots share that form,
+and results are kept in a bounded LRU cache keyed by it.
+
+Pure Python, no numpy needed.
+"""
+
+from functools import lru_cache
+from itertools import combinations, permutations
+
+from cards import to_ints
+from evaluator import strength_cards
+
+CACHE_SIZE = 8192
+STREETS = ((3, "Flop"), (4, "Turn"))
+
+SUIT_PERMUTATIONS = [tuple(p) for p in permutations(range(4))]
+
+def canonical_spot(player_hand, dealer_hand, community_cards):
+    """Smallest suit relabelling of a spot, with every card group sorted."""
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        spot = (
+            tuple(sorted(card & ~3 | perm[card & 3] for card in player_hand)),
+            tuple(sorted(card & ~3 | perm[card & 3] for card in dealer_hand)),
+            tuple(sorted(card & ~3 | perm[card & 3] for card in community_cards)),
+        )
+        if best is None or spot < best:
+            best = spot
+    return best
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _enumerate(spot):
+    player_hand, dealer_hand, community_cards = spot
+    known = set(player_hand + dealer_hand + community_cards)
+    remaining = [card for card in range(52) if card not in known]
+    player_cards = list(player_hand + community_cards)
+    dealer_cards = list(dealer_hand + community_cards)
+    wins = ties = boards = 0
+    for rest in combinations(remaining, 5 - len(community_cards)):
+        player = strength_cards(player_cards + list(rest))
+        dealer = strength_cards(dealer_cards + list(rest))
+        if player > dealer:
+            wins += 1
+        elif player == dealer:
+            ties += 1
+        boards += 1
+    return wins, ties, boards
+
+def exact_equity(player_hand, dealer_hand, community_cards):
+    """Exact win/tie/loss odds for the player with 3, 4 or 5 community cards.
+
+    Cards can be "Rank of Suit" strings, short notation or ints. Returns a
+    dict with win, tie, loss, equity and the number of boards enumerated.
+    """
+    player_hand = to_ints(player_hand)
+    dealer_hand = to_ints(dealer_hand)
+    community_cards = to_ints(community_cards)
+    if not 3 <= len(community_cards) <= 5:
+        raise ValueError("Exact equity needs 3 to 5 community cards; "
+                         "use equity.monte_carlo_equity() before the flop")
+    wins, ties, boards = _enumerate(canonical_spot(player_hand, dealer_hand, community_cards))
+    return {
+        'win': wins / boards,
+        'tie': ties / boards,
+        'loss': (boards - wins - ties) / boards,
+        'equity': (wins + ties / 2) / boards,
+        'boards': boards,
+    }
+
+def street_equities(player_hand, dealer_hand, community_cards):
+    """[(street name, exact_equity result)] for the flop and the turn."""
+    return [(name, exact_equity(player_hand, dealer_hand, community_cards[:count]))
+            for count, name in STREETS if len(community_cards) >= count]
+
+def cache_info():
+    return _enumerate.cache_info()
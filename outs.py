@@ -0,0 +1,98 @@
+"""
+Outs on the flop and the turn.
+
+For a position on the flop (3 community cards) or turn (4), every unseen
+card is tried as the next card, through evaluator.HandState: both hands'
+states are built once and each candidate card only adds itself. The
+result lists the cards that improve the player's or the dealer's hand
+category and the cards that change who is ahead.
+
+"Unseen" means not in either hand or on the board, so it includes cards
+that were actually dealt later; it is about the position, not the round.
+
+    python3 outs.py AsKs QdQh 2s7s9h
+"""
+
+import argparse
+
+from cards import HAND_OPTIONS, parse_cards, short_name
+from evaluator import CATEGORY_SHIFT, HandState, compare_strengths
+
+STREETS = {3: "Flop", 4: "Turn"}
+
+def outs(player_hand, dealer_hand, board):
+    """Outs for integer hole cards and a 3 or 4 card board, as a dict:
+
+    player_category, dealer_category, leader ("player", "dealer" or "tie"),
+    player_outs and dealer_outs ({new category: [cards]} for cards that
+    improve that hand's category), and changes ({new leader: [cards]}).
+    """
+    if len(board) not in STREETS:
+        raise ValueError("Outs need a flop or a turn (3 or 4 community cards)")
+    player = HandState.from_cards(player_hand + board)
+    dealer = HandState.from_cards(dealer_hand + board)
+    player_strength = player.strength()
+    dealer_strength = dealer.strength()
+    player_category = player_strength >> CATEGORY_SHIFT
+    dealer_category = dealer_strength >> CATEGORY_SHIFT
+    leader = compare_strengths(player_strength, dealer_strength)
+    known = set(player_hand + dealer_hand + board)
+    player_outs = {}
+    dealer_outs = {}
+    changes = {}
+    for card in range(52):
+        if card in known:
+            continue
+        p = player.add(card).strength()
+        d = dealer.add(card).strength()
+        if p >> CATEGORY_SHIFT > player_category:
+            player_outs.setdefault(p >> CATEGORY_SHIFT, []).append(card)
+        if d >> CATEGORY_SHIFT > dealer_category:
+            dealer_outs.setdefault(d >> CATEGORY_SHIFT, []).append(card)
+        winner = compare_strengths(p, d)
+        if winner != leader:
+            changes.setdefault(winner, []).append(card)
+    return {
+        'player_category': player_category,
+        'dealer_category': dealer_category,
+        'leader': leader,
+        'player_outs': player_outs,
+        'dealer_outs': dealer_outs,
+        'changes': changes,
+    }
+
+def street_outs(player_hand, dealer_hand, community_cards):
+    """[(street name, outs()), ...] for the flop and turn of a dealt board."""
+    return [(STREETS[size], outs(player_hand, dealer_hand, community_cards[:size]))
+            for size in (3, 4) if size <= len(community_cards)]
+
+def describe(result):
+    """Lines of text explaining one outs() result."""
+    leader = {'player': "you are ahead", 'dealer': "the dealer is ahead", 'tie': "it is a tie"}[result['leader']]
+    lines = [f"You have {HAND_OPTIONS[result['player_category']]}, the dealer "
+             f"{HAND_OPTIONS[result['dealer_category']]}; {leader}."]
+    for who, found in (("you", result['player_outs']), ("the dealer", result['dealer_outs'])):
+        count = sum(len(cards) for cards in found.values())
+        if not count:
+            lines.append(f"No card improves {who}.")
+            continue
+        parts = [f"{HAND_OPTIONS[category]}: {' '.join(short_name(card) for card in cards)}"
+                 for category, cards in sorted(found.items())]
+        lines.append(f"{'1 card improves' if count == 1 else f'{count} cards improve'} {who}: {'; '.join(parts)}")
+    outcome = {'player': "put you ahead", 'dealer': "put the dealer ahead", 'tie': "make it a tie"}
+    for winner, cards in sorted(result['changes'].items()):
+        lines.append(f"{len(cards)} card{'s' if len(cards) != 1 else ''} would {outcome[winner]}: "
+                     f"{' '.join(short_name(card) for card in cards)}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="List the outs for a flop or turn.")
+    parser.add_argument('player', help="player hole cards, e.g. AsKs")
+    parser.add_argument('dealer', help="dealer hole cards, e.g. QdQh")
+    parser.add_argument('board', help="3 or 4 community cards, e.g. 2s7s9h")
+    args = parser.parse_args()
+    for line in describe(outs(parse_cards(args.player), parse_cards(args.dealer), parse_cards(args.board))):
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -16,134 +16,44 @@ but in this practice game you will not practice the betting rounds part.
 202506 - Frank Font created initial version
 """
 
+import argparse
+import csv
+import getpass
 import random
-from collections import Counter
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cards import HAND_OPTIONS, SUITS, cards_to_ints, ints_to_cards, parse_round_token, round_token, short_name
+from dealer import Dealer, split_round
+from drills import deal_drill, parse_drill
+from evaluator import CATEGORY_SHIFT, compare_strengths, hand_best_five, hand_category
+from exact_equity import street_equities
+from outs import describe, street_outs
+from preflop import preflop_equity
+from round_log import WINNERS, RoundLog
+from stats_store import StatsStore
 
-SUITS = {
-    'Spades': '♠',
-    'Clubs': '♣',
-    'Hearts': '♥',
-    'Diamonds': '♦'
-}
-RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-RANK_VALUES = {r: i for i, r in enumerate(RANKS, start=2)}
 BET_AMOUNTS = [5, 10, 25]
-
-HAND_OPTIONS = [
-    "High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight",
-    "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush"
-]
-
-def card_value(card):
-    rank, _, suit = card.partition(" of ")
-    return rank, suit
-
-def rank_value(rank):
-    return RANK_VALUES[rank]
-
-def evaluate_hand(cards):
-    ranks = []
-    suits = []
-    for card in cards:
-        r, s = card_value(card)
-        ranks.append(r)
-        suits.append(s)
-    rank_counts = Counter(ranks)
-    suit_counts = Counter(suits)
-    rank_nums = sorted([rank_value(r) for r in ranks], reverse=True)
-    flush_suit = None
-    for suit, count in suit_counts.items():
-        if count >= 5:
-            flush_suit = suit
-            break
-    flush_cards = []
-    if flush_suit:
-        flush_cards = [rank_value(r) for r, s in zip(ranks, suits) if s == flush_suit]
-        flush_cards.sort(reverse=True)
-    unique_rank_nums = sorted(set(rank_nums), reverse=True)
-
-    def is_straight(vals):
-        for i in range(len(vals) - 4):
-            window = vals[i:i+5]
-            if window[0] - window[4] == 4:
-                return window[0]
-        if set([14, 5, 4, 3, 2]).issubset(set(vals)):
-            return 5
-        return None
-
-    straight_flush_high = None
-    if flush_suit:
-        sf_high = is_straight(flush_cards)
-        if sf_high:
-            straight_flush_high = sf_high
-
-    fours = [r for r, c in rank_counts.items() if c == 4]
-    threes = [r for r, c in rank_counts.items() if c == 3]
-    pairs = [r for r, c in rank_counts.items() if c == 2]
-
-    if straight_flush_high == 14:
-        return (9, [14])
-    if straight_flush_high:
-        return (8, [straight_flush_high])
-    if fours:
-        quad_rank = max([rank_value(r) for r in fours])
-        kickers = [r for r in rank_nums if r != quad_rank]
-        return (7, [quad_rank] + kickers)
-    if threes and (pairs or len(threes) > 1):
-        trip_rank = max([rank_value(r) for r in threes])
-        if len(threes) > 1:
-            pair_rank = max([rank_value(r) for r in threes if rank_value(r) != trip_rank])
-        else:
-            pair_rank = max([rank_value(r) for r in pairs]) if pairs else 0
-        return (6, [trip_rank, pair_rank])
-    if flush_suit:
-        top5 = flush_cards[:5]
-        return (5, top5)
-    straight_high = is_straight(unique_rank_nums)
-    if straight_high:
-        return (4, [straight_high])
-    if threes:
-        trip_rank = max([rank_value(r) for r in threes])
-        kickers = [r for r in rank_nums if r != trip_rank][:2]
-        return (3, [trip_rank] + kickers)
-    if len(pairs) >= 2:
-        top_pairs = sorted([rank_value(r) for r in pairs], reverse=True)[:2]
-        kicker = max([r for r in rank_nums if r not in top_pairs])
-        return (2, top_pairs + [kicker])
-    if pairs:
-        pair_rank = max([rank_value(r) for r in pairs])
-        kickers = [r for r in rank_nums if r != pair_rank][:3]
-        return (1, [pair_rank] + kickers)
-    return (0, rank_nums[:5])
+START_MONEY = 100
+ROUND_BET = 10
 
 def hand_rank_name(rank_index):
     return HAND_OPTIONS[rank_index]
 
-def compare_hands(player_hand_rank, dealer_hand_rank):
-    if player_hand_rank[0] > dealer_hand_rank[0]:
-        return "player"
-    elif player_hand_rank[0] < dealer_hand_rank[0]:
-        return "dealer"
-    else:
-        for p_val, d_val in zip(player_hand_rank[1], dealer_hand_rank[1]):
-            if p_val > d_val:
-                return "player"
-            elif p_val < d_val:
-                return "dealer"
-        return "tie"
-
 def format_card(card_str):
     rank, _, suit = card_str.partition(" of ")
     return f"[{rank}{SUITS[suit]}]"
 
-def display_cards(cards, revealed_count=None):
+def display_cards(cards, revealed_count=None, used=(), kickers=()):
+    """Print the cards; those at indexes in used get a * (a + for kickers)."""
     if revealed_count is None:
         revealed_count = len(cards)
     display = ""
     for i, card in enumerate(cards):
         if i < revealed_count:
-            display += format_card(card) + " "
+            mark = "+" if i in kickers else "*" if i in used else ""
+            display += format_card(card) + mark + " "
         else:
             display += "[FACE-DOWN] "
     print(display.strip())
@@ -208,6 +118,18 @@ _total_rounds = 0
 _total_failed_hand_ids = 0
 _total_failed_winner_ids = 0
 
+_dealer = Dealer()
+# Drill mode (--drill/--vs): (player category, dealer category or None) and its random stream
+_drill = None
+_drill_rng = random.Random()
+# Persistent statistics, when started with --stats-db
+_stats = None
+_user = None
+# Append-only round log, when started with --log
+_log = None
+
+_replay = None  # token of a round to deal first
+
 def timed_choose_hand(prompt):
     start = time.time()
     result = choose_hand(prompt)
@@ -220,29 +142,48 @@ def timed_choose_winner():
     elapsed = time.time() - start
     return result, elapsed
 
+def settle(player_money, dealer_money, winner, bet=ROUND_BET):
+    """Money after a round: both put in the bet, the winner takes the pot, a tie splits it."""
+    pot = bet * 2
+    player_money -= bet
+    dealer_money -= bet
+    if winner == "player":
+        player_money += pot
+    elif winner == "dealer":
+        dealer_money += pot
+    else:
+        player_money += pot // 2
+        dealer_money += pot // 2
+    return player_money, dealer_money
+
 def play_game(player_money, dealer_money):
     global _total_time_identify_hands, _total_time_identify_winner, _total_rounds, _total_failed_hand_ids, _total_failed_winner_ids
-    deck = [f"{rank} of {suit}" for suit in SUITS for rank in RANKS]
-    random.shuffle(deck)
-
+    global _replay, _drill
     print("\n=== New Game: Texas Hold'em ===")
 
-    player_hand = [deck.pop(), deck.pop()]
-    dealer_hand = [deck.pop(), deck.pop()]
-    community_cards = [deck.pop() for _ in range(5)]
-
-    pot = 0
-    bet = 10
+    dealt = None
+    if _replay is not None:
+        dealt = split_round(ints_to_cards(parse_round_token(_replay)))
+        _replay = None
+    elif _drill is not None:
+        try:
+            dealt = [ints_to_cards(cards) for cards in deal_drill(*_drill, _drill_rng)]
+        except ValueError as e:
+            # A pair that can never be dealt; go back to ordinary deals
+            print(f"{e}; dealing any hands from now on.")
+            _drill = None
+    if dealt is None:
+        dealt = _dealer.deal_round_strings()
+    player_hand, dealer_hand, community_cards = dealt
+
+    bet = ROUND_BET
     if player_money < bet:
         print("You do not have enough money to continue betting. Game over.")
         return player_money, dealer_money, False
     if dealer_money < bet:
         print("Dealer does not have enough money. You win!")
-        return player_money + pot, dealer_money - pot, False
-
-    player_money -= bet
-    dealer_money -= bet
-    pot += bet * 2
+        return player_money, dealer_money, False
+    pot = bet * 2
 
     print("\nCommunity Cards:")
     display_cards(community_cards)
@@ -253,8 +194,10 @@ def play_game(player_money, dealer_money):
     print("\nDealer's hand:")
     display_cards(dealer_hand)
 
-    player_best = evaluate_hand(player_hand + community_cards)
-    dealer_best = evaluate_hand(dealer_hand + community_cards)
+    player_strength, player_used, player_kickers = hand_best_five(player_hand + community_cards)
+    dealer_strength, dealer_used, dealer_kickers = hand_best_five(dealer_hand + community_cards)
+    player_category = hand_category(player_strength)
+    dealer_category = hand_category(dealer_strength)
 
     # Timed hand identification
     (player_declared_hand_name, player_declared_rank), hand_time1 = timed_choose_hand("Name your hand (pick from options):")
@@ -274,25 +217,40 @@ def play_game(player_money, dealer_money):
     print(f"Dealer's declared hand: {dealer_declared_hand_name}")
     print(f"Your guess for winner: {winner_guess.capitalize()}")
 
-    print(f"\nCorrect player's hand: {hand_rank_name(player_best[0])}")
-    print(f"Correct dealer's hand: {hand_rank_name(dealer_best[0])}")
+    print(f"\nCorrect player's hand: {hand_rank_name(player_category)}")
+    print(f"Correct dealer's hand: {hand_rank_name(dealer_category)}")
 
-    actual_winner = compare_hands(player_best, dealer_best)
+    actual_winner = compare_strengths(player_strength, dealer_strength)
     print(f"Actual winner: {actual_winner.capitalize()}")
-
-    if player_declared_rank == player_best[0]:
+    print(f"Round {round_token(cards_to_ints(player_hand + dealer_hand + community_cards))} (play it again with --replay)")
+    print("\nYour best five (* plays, + kicker):")
+    display_cards(player_hand + community_cards, used=player_used, kickers=player_kickers)
+    print("Dealer's best five:")
+    display_cards(dealer_hand + community_cards, used=dealer_used, kickers=dealer_kickers)
+    preflop_odds = preflop_equity(player_hand, dealer_hand)
+    if preflop_odds is not None:
+        print(f"Your equity before the flop: {preflop_odds:.1%}")
+    for street, odds in street_equities(player_hand, dealer_hand, community_cards):
+        print(f"Your odds on the {street.lower()}: {odds['win']:.1%} win, {odds['tie']:.1%} tie, {odds['loss']:.1%} lose")
+    for street, result in street_outs(cards_to_ints(player_hand), cards_to_ints(dealer_hand),
+                                      cards_to_ints(community_cards)):
+        print(f"\nOuts on the {street.lower()}:")
+        for line in describe(result):
+            print("  " + line)
+
+    if player_declared_rank == player_category:
         print("✅ You correctly identified your best hand.")
     else:
         print("❌ Your guess for your hand was incorrect.")
-        explanation = simple_hand_explanation(player_declared_rank, player_best[0], player_hand + community_cards)
+        explanation = simple_hand_explanation(player_declared_rank, player_category, player_hand + community_cards)
         if explanation:
             print("Explanation:", explanation)
 
-    if dealer_declared_rank == dealer_best[0]:
+    if dealer_declared_rank == dealer_category:
         print("✅ You correctly identified the dealer's best hand.")
     else:
         print("❌ Your guess for the dealer's hand was incorrect.")
-        explanation = simple_hand_explanation(dealer_declared_rank, dealer_best[0], dealer_hand + community_cards)
+        explanation = simple_hand_explanation(dealer_declared_rank, dealer_category, dealer_hand + community_cards)
         if explanation:
             print("Explanation:", explanation)
 
@@ -301,17 +259,22 @@ def play_game(player_money, dealer_money):
     else:
         print("❌ Your guess for the winner was incorrect.")
 
+    if _stats is not None:
+        _stats.record(_user, player_category, dealer_category, player_declared_rank, dealer_declared_rank,
+                      actual_winner, winner_guess, this_hand_id_time, this_winner_id_time, source='cli')
+    if _log is not None:
+        _log.append(cards_to_ints(player_hand + dealer_hand + community_cards), player_category, dealer_category,
+                    player_declared_rank, dealer_declared_rank, actual_winner, winner_guess,
+                    this_hand_id_time, this_winner_id_time)
+
+    player_money, dealer_money = settle(player_money, dealer_money, actual_winner, bet)
     if actual_winner == "player":
-        player_money += pot
         print(f"\nYou win ${pot}! Your total money: ${player_money}")
         print(f"Dealer's money: ${dealer_money}")
     elif actual_winner == "dealer":
-        dealer_money += pot
         print(f"\nDealer wins ${pot}. Your total money: ${player_money}")
         print(f"Dealer's money: ${dealer_money}")
     else:
-        player_money += pot // 2
-        dealer_money += pot // 2
         print(f"\nIt's a tie! Pot split. Your total money: ${player_money}")
         print(f"Dealer's money: ${dealer_money}")
 
@@ -322,9 +285,9 @@ def play_game(player_money, dealer_money):
     # Count failed guesses for this round
     failed_hand = 0
     failed_winner = 0
-    if player_declared_rank != player_best[0]:
+    if player_declared_rank != player_category:
         failed_hand += 1
-    if dealer_declared_rank != dealer_best[0]:
+    if dealer_declared_rank != dealer_category:
         failed_hand += 1
     if winner_guess != actual_winner:
         failed_winner += 1
@@ -345,7 +308,175 @@ def play_game(player_money, dealer_money):
 
     return player_money, dealer_money, True
 
+# --- Headless simulation ---
+#
+# --simulate plays rounds without asking anything. Worker processes deal
+# and evaluate chunks of rounds with NumPy; this process settles them in
+# order with settle() and the same rules as the game (a new game starts
+# at START_MONEY each once either side cannot bet) and streams every
+# chunk to the output file, so memory use does not grow with the number
+# of rounds. Requires numpy.
+
+SIM_CHUNK = 50000
+SIM_COLUMNS = [
+    ('cards', 'u1', (9,)),  # deal order: player, dealer, community
+    ('player_category', 'u1'),
+    ('dealer_category', 'u1'),
+    ('winner', 'u1'),  # index into round_log.WINNERS
+    ('game', '<u4'),
+    ('player_money', '<i4'),  # after the round
+    ('dealer_money', '<i4'),
+]
+
+def simulate_chunk(rounds, seed):
+    """Deal and evaluate `rounds` rounds; a structured array with the money columns left 0."""
+    import numpy as np
+    from batch_eval import strength_batch
+    cards = Dealer(seed).deal_many(rounds)
+    player = strength_batch(np.hstack([cards[:, 0:2], cards[:, 4:]]))
+    dealer = strength_batch(np.hstack([cards[:, 2:4], cards[:, 4:]]))
+    chunk = np.zeros(rounds, dtype=SIM_COLUMNS)
+    chunk['cards'] = cards
+    chunk['player_category'] = player >> CATEGORY_SHIFT
+    chunk['dealer_category'] = dealer >> CATEGORY_SHIFT
+    chunk['winner'] = np.where(player > dealer, 0, np.where(player < dealer, 1, 2))
+    return chunk
+
+def _settle_chunk(chunk, state):
+    # state is [player money, dealer money, game], carried from chunk to chunk
+    player_money, dealer_money, game = state
+    games = []
+    player = []
+    dealer = []
+    for winner in chunk['winner'].tolist():
+        if player_money < ROUND_BET or dealer_money < ROUND_BET:
+            player_money = dealer_money = START_MONEY
+            game += 1
+        player_money, dealer_money = settle(player_money, dealer_money, WINNERS[winner])
+        games.append(game)
+        player.append(player_money)
+        dealer.append(dealer_money)
+    chunk['game'] = games
+    chunk['player_money'] = player
+    chunk['dealer_money'] = dealer
+    state[:] = player_money, dealer_money, game
+
+def _chunks(rounds, workers, seed):
+    # Settled-order chunks; at most two per worker are in flight or waiting
+    sizes = [SIM_CHUNK] * (rounds // SIM_CHUNK)
+    if rounds % SIM_CHUNK:
+        sizes.append(rounds % SIM_CHUNK)
+    seeds = [None if seed is None else f"{seed}:{i}" for i in range(len(sizes))]
+    if workers == 1:
+        for size, chunk_seed in zip(sizes, seeds):
+            yield simulate_chunk(size, chunk_seed)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for size, chunk_seed in zip(sizes, seeds):
+            pending.append(pool.submit(simulate_chunk, size, chunk_seed))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def simulate(rounds, out_path, workers=1, seed=None):
+    """Play `rounds` rounds into out_path (.npy, else CSV); returns a summary dict.
+
+    The .npy file holds one structured array with the SIM_COLUMNS fields and
+    can be opened with numpy.load(out_path, mmap_mode='r'). The same seed
+    gives the same rounds with any number of workers.
+    """
+    from numpy.lib.format import open_memmap
+    state = [START_MONEY, START_MONEY, 0]
+    wins = [0, 0, 0]
+    done = 0
+    start = time.perf_counter()
+    if out_path.endswith('.npy'):
+        out = open_memmap(out_path, mode='w+', dtype=SIM_COLUMNS, shape=(rounds,))
+        csv_file = writer = None
+    else:
+        out = None
+        csv_file = open(out_path, 'w', newline='')
+        writer = csv.writer(csv_file)
+        writer.writerow(['cards'] + [name for name, *_ in SIM_COLUMNS[1:]])
+    try:
+        for chunk in _chunks(rounds, workers, seed):
+            _settle_chunk(chunk, state)
+            winners = chunk['winner'].tolist()
+            for winner in range(len(WINNERS)):
+                wins[winner] += winners.count(winner)
+            if out is not None:
+                out[done:done + len(chunk)] = chunk
+                out.flush()
+            else:
+                writer.writerows([''.join(short_name(card) for card in row[0])] + list(row[1:])
+                                 for row in chunk.tolist())
+            done += len(chunk)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        del out
+    return {
+        'rounds': done,
+        'games': state[2] + 1 if done else 0,
+        'wins': dict(zip(WINNERS, wins)),
+        'player_money': state[0],
+        'dealer_money': state[1],
+        'elapsed': time.perf_counter() - start,
+    }
+
 def main():
+    global _dealer, _stats, _user, _log, _drill, _drill_rng, _replay
+    parser = argparse.ArgumentParser(description="Texas Hold'em Quiz Game")
+    parser.add_argument('--seed', help="deal a reproducible sequence of rounds")
+    parser.add_argument('--stats-db', help="keep your statistics in this database (see stats_store.py)")
+    parser.add_argument('--user', help="name to record statistics under (default: your login name)")
+    parser.add_argument('--log', help="append every round to this log (see round_log.py)")
+    parser.add_argument('--drill', help="always give you this hand, e.g. 'Full House' (see drills.py)")
+    parser.add_argument('--vs', help="with --drill, always give the dealer this hand")
+    parser.add_argument('--replay', metavar='TOKEN', help="start with the round of this token (shown after each round)")
+    parser.add_argument('--simulate', type=int, metavar='N', help="play N rounds without asking, into --out")
+    parser.add_argument('--workers', type=int, default=1, help="processes for --simulate")
+    parser.add_argument('--out', default='rounds.npy', help="--simulate output: .npy, or CSV for any other name")
+    args = parser.parse_args()
+    if args.simulate is not None:
+        if args.drill:
+            parser.error("--simulate deals every hand; it does not combine with --drill")
+        if args.simulate < 1 or args.workers < 1:
+            parser.error("--simulate and --workers need a positive number")
+        result = simulate(args.simulate, args.out, args.workers, args.seed)
+        wins = result['wins']
+        print(f"{result['rounds']:,} rounds in {result['games']:,} games written to {args.out}")
+        print(f"Player wins {wins['player']:,}, dealer wins {wins['dealer']:,}, ties {wins['tie']:,}")
+        print(f"Last game ended at ${result['player_money']} / ${result['dealer_money']}")
+        print(f"{result['rounds'] / result['elapsed']:,.0f} rounds/sec on {args.workers} workers")
+        return
+    if args.seed is not None:
+        _dealer = Dealer(args.seed)
+        _drill_rng = random.Random(args.seed)
+    if args.replay:
+        try:
+            parse_round_token(args.replay)
+        except ValueError as e:
+            parser.error(str(e))
+        _replay = args.replay
+    if args.vs and not args.drill:
+        parser.error("--vs needs --drill")
+    if args.drill:
+        try:
+            _drill = parse_drill(args.drill, args.vs)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.stats_db:
+        _stats = StatsStore(args.stats_db)
+        _user = args.user or getpass.getuser()
+    if args.log:
+        try:
+            _log = RoundLog(args.log)
+        except ValueError as e:
+            parser.error(str(e))
+
     player_money = 100
     dealer_money = 100
 
@@ -356,13 +487,19 @@ def main():
     print(f"\nYou and the dealer start with ${player_money} each,")
     print("but in this practice game you will not practice the betting rounds part.")
 
-    while True:
-        player_money, dealer_money, can_continue = play_game(player_money, dealer_money)
-        if not can_continue:
-            break
-        cont = input("\nPlay another round? (y/n): ").strip().lower()
-        if cont != 'y':
-            break
+    try:
+        while True:
+            player_money, dealer_money, can_continue = play_game(player_money, dealer_money)
+            if not can_continue:
+                break
+            cont = input("\nPlay another round? (y/n): ").strip().lower()
+            if cont != 'y':
+                break
+    finally:
+        if _stats is not None:
+            _stats.close()  # write out the rounds still queued
+        if _log is not None:
+            _log.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Precomputed preflop equity of every starting hand class against every other.
+
+There are 169 starting hand classes: 13 pocket pairs, 78 suited and 78
+offsuit hands. Class i sits in row i // 13, column i % 13 of the usual
+13x13 grid (Aces first, suited hands above the diagonal). The table holds
+the equity of the row class against the column class, averaged over all
+card combinations that do not share a card and over all boards.
+
+Building the table takes a while, so it is done once by a generator
+command and written to a small binary file:
+
+    python3 preflop.py build --samples 20000 --workers 8
+
+The games look up equities with preflop_equity(). The file is memory
+mapped on first use, so start-up stays fast and every process that reads
+it shares the same pages. When the file has not been built the lookup
+returns None.
+
+Building requires numpy; looking up does not.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cards import SHORT_RANKS, to_ints
+
+NUM_CLASSES = 169
+MAGIC = b'PFEQ'
+VERSION = 1
+HEADER = struct.Struct('<4sII')  # magic, version, number of classes
+DEFAULT_PATH = os.environ.get(
+    'PREFLOP_TABLE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'preflop_equity.bin'))
+CHUNK_PAIRS = 64
+
+def hand_class(card1, card2):
+    """Class index 0..168 of two integer hole cards."""
+    high, low = max(card1 >> 2, card2 >> 2), min(card1 >> 2, card2 >> 2)
+    row, col = 12 - high, 12 - low
+    if (card1 & 3) == (card2 & 3):
+        return row * 13 + col  # suited: above the diagonal
+    return col * 13 + row
+
+def class_name(index):
+    row, col = divmod(index, 13)
+    if row == col:
+        return SHORT_RANKS[12 - row] * 2
+    if row < col:
+        return SHORT_RANKS[12 - row] + SHORT_RANKS[12 - col] + 's'
+    return SHORT_RANKS[12 - col] + SHORT_RANKS[12 - row] + 'o'
+
+CLASS_NAMES = [class_name(i) for i in range(NUM_CLASSES)]
+CLASS_INDEX = {name: i for i, name in enumerate(CLASS_NAMES)}
+
+def class_combos(index):
+    """Every (card1, card2) pair of integer cards in a class."""
+    return [(a, b) for a in range(52) for b in range(a + 1, 52) if hand_class(a, b) == index]
+
+# --- Lookup ---
+
+_table = None
+_MISSING = object()  # _table once the file was found not to exist
+
+def load_table(path=DEFAULT_PATH):
+    """Memory-map the table file; returns None when it does not exist.
+
+    Either outcome is remembered, so the games look for the file only once.
+    """
+    global _table
+    if _table is _MISSING:
+        return None
+    if _table is not None:
+        return _table
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        _table = _MISSING
+        return None
+    magic, version, size = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or size != NUM_CLASSES:
+        raise ValueError(f"{path} is not a preflop equity table")
+    if sys.byteorder != 'little':
+        raise ValueError("preflop tables are little-endian")
+    _table = memoryview(mapped)[HEADER.size:HEADER.size + 4 * size * size].cast('f')
+    return _table
+
+def class_equity(player_class, dealer_class):
+    table = load_table()
+    if table is None:
+        return None
+    return table[player_class * NUM_CLASSES + dealer_class]
+
+def preflop_equity(player_hand, dealer_hand):
+    """Player's preflop equity from two hole cards each, or None without a table.
+
+    Cards can be "Rank of Suit" strings, short notation ("As") or ints.
+    """
+    player_hand = to_ints(player_hand)
+    dealer_hand = to_ints(dealer_hand)
+    return class_equity(hand_class(*player_hand), hand_class(*dealer_hand))
+
+# --- Building ---
+
+def _matchup_equity(rng, combos_a, combos_b, samples):
+    import numpy as np
+    from batch_eval import strength_batch
+    # Random combo of each class, redrawing rows where the two share a card
+    a = combos_a[rng.integers(len(combos_a), size=samples)]
+    b = combos_b[rng.integers(len(combos_b), size=samples)]
+    while True:
+        clash = ((a[:, :, None] == b[:, None, :]).any(axis=(1, 2))).nonzero()[0]
+        if not len(clash):
+            break
+        b[clash] = combos_b[rng.integers(len(combos_b), size=len(clash))]
+    # Five random board cards avoiding the four hole cards
+    keys = rng.random((samples, 52))
+    rows = np.arange(samples)[:, None]
+    keys[rows, a] = 2.0
+    keys[rows, b] = 2.0
+    board = np.argpartition(keys, 4, axis=1)[:, :5]
+    player = strength_batch(np.hstack([a, board]))
+    dealer = strength_batch(np.hstack([b, board]))
+    return float(((player > dealer).sum() + (player == dealer).sum() / 2) / samples)
+
+def _build_chunk(pairs, samples, seed_seq):
+    import numpy as np
+    rng = np.random.default_rng(seed_seq)
+    combos = {}
+    results = []
+    for a, b in pairs:
+        for index in (a, b):
+            if index not in combos:
+                combos[index] = np.array(class_combos(index), dtype=np.intp)
+        results.append(_matchup_equity(rng, combos[a], combos[b], samples))
+    return pairs, results
+
+def build_table(path=DEFAULT_PATH, samples=20000, workers=None, seed=None):
+    """Estimate every matchup with `samples` random deals and write the table file."""
+    global _table
+    import numpy as np
+    pairs = [(a, b) for a in range(NUM_CLASSES) for b in range(a + 1, NUM_CLASSES)]
+    chunks = [pairs[i:i + CHUNK_PAIRS] for i in range(0, len(pairs), CHUNK_PAIRS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    table = np.full((NUM_CLASSES, NUM_CLASSES), 0.5, dtype='<f4')
+    start = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk, results in pool.map(_build_chunk, chunks, [samples] * len(chunks), seeds):
+            for (a, b), equity in zip(chunk, results):
+                table[a, b] = equity
+                table[b, a] = 1.0 - equity
+            done += len(chunk)
+            print(f"\r{done}/{len(pairs)} matchups", end='', flush=True)
+    print(f"\nBuilt in {time.perf_counter() - start:.1f}s")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, NUM_CLASSES))
+        f.write(table.tobytes())
+    _table = None  # look again on the next lookup
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Preflop equity table for every pair of starting hands.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="generate the table file")
+    build.add_argument('--samples', type=int, default=20000, help="random deals per matchup")
+    build.add_argument('--workers', type=int, default=None)
+    build.add_argument('--seed', type=int, default=None)
+    build.add_argument('--out', default=DEFAULT_PATH)
+    show = sub.add_parser('show', help="look up one matchup, e.g. AKs QQ")
+    show.add_argument('player')
+    show.add_argument('dealer')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f"Wrote {build_table(args.out, args.samples, args.workers, args.seed)}")
+    else:
+        equity = class_equity(CLASS_INDEX[args.player], CLASS_INDEX[args.dealer])
+        if equity is None:
+            sys.exit(f"No table at {DEFAULT_PATH}; run: python3 preflop.py build")
+        print(f"{args.player} vs {args.dealer}: {equity:.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Hand ranges and range against range equity.
+
+A range is written the usual way, as comma separated terms:
+
+    AA, AKs, AKo, AK        a pair, suited, offsuit, or both
+    QQ+, A2s+, K9o+         a pair and every higher pair; raise the kicker
+                            up to just below the top card
+    JJ-88, A5s-A2s, T9s-76s pairs, kickers or connectors between two ends
+    AsKs                    one exact combination
+    QQ+:0.5                 any term with a weight (1 when left out)
+
+There are 1326 two-card combinations. COMBOS lists them and a set of them
+is kept as one Python int with a bit per combination, so ranges are small,
+hashable and quick to combine. parse_range() returns a weighted range: a
+tuple of (weight, bits) groups. Combinations holding a dead card, like
+the known board, are dropped.
+
+range_equity() plays every hero combination against every villain
+combination on a set of boards, all boards of a turn or flop or a seeded
+sample before the flop. For each chunk of boards the strengths of all
+hero and villain combinations on those boards are evaluated in one
+batch_eval call, then compared by broadcasting hero strengths against
+villain strengths, weighted by both combination weights. Pairs that share
+a card, or hold a card of the board, weigh nothing. Results for a
+matchup are kept in an LRU cache.
+
+    python3 ranges.py "QQ+, AKs" "T9s-76s, 22+" --board 2c7d9h
+
+Requires numpy.
+"""
+
+import argparse
+import re
+import time
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from batch_eval import random_boards, strength_batch
+from cards import SHORT_RANKS, SHORT_SUITS, parse_cards, short_name
+
+COMBOS = list(combinations(range(52), 2))
+COMBO_INDEX = {combo: i for i, combo in enumerate(COMBOS)}
+# bits of every combination holding a card
+CARD_COMBOS = [sum(1 << i for i, combo in enumerate(COMBOS) if card in combo) for card in range(52)]
+
+EXACT_BOARDS = comb(49, 2)  # enumerate every board up to this many (all of them from the flop on)
+BOARD_SAMPLES = 2000
+PAIR_CHUNK = 1 << 22  # boards x hero combos x villain combos compared at once
+CACHE_SIZE = 256
+
+CLASS_TERM = re.compile(r'([2-9TJQKA])([2-9TJQKA])([so]?)$')
+
+# --- Parsing ---
+
+def _rank(char):
+    return SHORT_RANKS.index(char)
+
+def _parse_class(text):
+    """(high, low, kind) rank indexes and '', 's' or 'o' for a term like "AKs" or "QQ"."""
+    match = CLASS_TERM.match(text[:2].upper() + text[2:].lower())
+    if not match:
+        raise ValueError(f"Unknown hand {text!r}")
+    high, low, kind = _rank(match[1]), _rank(match[2]), match[3]
+    if high < low:
+        high, low = low, high
+    if high == low and kind:
+        raise ValueError(f"A pair is neither suited nor offsuit: {text!r}")
+    return high, low, kind
+
+@lru_cache(maxsize=None)
+def class_bits(high, low, kind=''):
+    """Bits of the combinations of one hand class, e.g. (12, 11, 's') for AKs."""
+    bits = 0
+    for a, b in COMBOS:
+        if {a >> 2, b >> 2} != {high, low} or (a >> 2 == b >> 2) != (high == low):
+            continue
+        suited = a & 3 == b & 3
+        if kind == 's' and not suited or kind == 'o' and suited:
+            continue
+        bits |= 1 << COMBO_INDEX[a, b]
+    return bits
+
+def _term_classes(term):
+    if '-' in term:
+        first, last = (_parse_class(end) for end in term.split('-', 1))
+        if first[2] != last[2]:
+            raise ValueError(f"Both ends of {term!r} must be suited, offsuit or neither")
+        (high1, low1, kind), (high2, low2, _) = first, last
+        if high1 == low1 and high2 == low2:
+            return [(r, r, '') for r in range(min(high1, high2), max(high1, high2) + 1)]
+        if high1 == high2:
+            return [(high1, r, kind) for r in range(min(low1, low2), max(low1, low2) + 1)]
+        if high1 - low1 == high2 - low2:
+            gap = high1 - low1
+            return [(r, r - gap, kind) for r in range(min(high1, high2), max(high1, high2) + 1)]
+        raise ValueError(f"Unknown range {term!r}")
+    if term.endswith('+'):
+        high, low, kind = _parse_class(term[:-1])
+        if high == low:
+            return [(r, r, '') for r in range(high, 13)]
+        return [(high, r, kind) for r in range(low, high)]
+    return [_parse_class(term)]
+
+def term_bits(term):
+    """Bits of one range term without a weight, e.g. "T9s-76s" or "AsKs"."""
+    term = term.strip().replace('10', 'T')
+    if len(term) == 4 and term[1].lower() in SHORT_SUITS and term[3].lower() in SHORT_SUITS:
+        a, b = sorted(parse_cards(term))
+        if a == b:
+            raise ValueError(f"The same card twice in {term!r}")
+        return 1 << COMBO_INDEX[a, b]
+    bits = 0
+    for high, low, kind in _term_classes(term):
+        bits |= class_bits(high, low, kind)
+    return bits
+
+def dead_bits(dead):
+    """Bits of every combination holding one of the dead integer cards."""
+    bits = 0
+    for card in dead:
+        bits |= CARD_COMBOS[card]
+    return bits
+
+def parse_range(text, dead=()):
+    """Weighted range ((weight, bits), ...) for range notation, without dead cards.
+
+    A combination named by two terms keeps the weight of the last one.
+    """
+    weights = {}
+    for term in text.split(','):
+        if not term.strip():
+            continue
+        term, _, weight = term.partition(':')
+        weight = float(weight) if weight.strip() else 1.0
+        if weight < 0:
+            raise ValueError(f"Negative weight in {term!r}")
+        bits = term_bits(term)
+        for other in weights:
+            weights[other] &= ~bits
+        weights[weight] = weights.get(weight, 0) | bits
+    return remove_dead(tuple(sorted(weights.items(), reverse=True)), dead)
+
+def remove_dead(hand_range, dead):
+    mask = ~dead_bits(dead)
+    return tuple((weight, bits & mask) for weight, bits in hand_range if weight and bits & mask)
+
+def range_combos(hand_range):
+    """(cards, weights): an (N, 2) uint8 array of hole cards and their weights."""
+    cards = []
+    weights = []
+    for weight, bits in hand_range:
+        while bits:
+            low = bits & -bits
+            cards.append(COMBOS[low.bit_length() - 1])
+            weights.append(weight)
+            bits ^= low
+    return np.array(cards, dtype=np.uint8).reshape(-1, 2), np.array(weights, dtype=np.float64)
+
+def range_size(hand_range):
+    """Number of combinations in a range, each counted by its weight."""
+    return sum(weight * bin(bits).count('1') for weight, bits in hand_range)
+
+def combo_names(hand_range):
+    """Short names like "AsKs" of every combination in a range."""
+    cards, _ = range_combos(hand_range)
+    return [short_name(a) + short_name(b) for b, a in cards.tolist()]
+
+# --- Equity ---
+
+def _boards(board, samples, seed):
+    """(B, 5) uint8 array of the boards to play: every completion, or a sample of them."""
+    remaining = [card for card in range(52) if card not in board]
+    need = 5 - len(board)
+    if comb(len(remaining), need) > EXACT_BOARDS:
+        return random_boards(board, (), samples, np.random.default_rng(seed))
+    rest = list(combinations(remaining, need))
+    rest = np.array(rest, dtype=np.uint8).reshape(len(rest), need)
+    boards = np.empty((len(rest), 5), dtype=np.uint8)
+    boards[:, :len(board)] = board
+    boards[:, len(board):] = rest
+    return boards
+
+def _blocked(hole, boards):
+    # (B, N): hole combination n shares a card with board b
+    return (hole[None, :, :, None] == boards[:, None, None, :]).any(axis=(2, 3))
+
+def _strengths(hole, boards, blocked):
+    # (B, N) strengths of every hole combination on every board, 0 where they share a card
+    hands = np.concatenate([np.broadcast_to(hole[None], (len(boards),) + hole.shape),
+                            np.broadcast_to(boards[:, None], (len(boards), len(hole), 5))], axis=2)
+    strengths = np.zeros(blocked.shape, dtype=np.int32)
+    strengths[~blocked] = strength_batch(hands[~blocked])
+    return strengths
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _range_equity(hero, villain, board, samples, seed):
+    hero_cards, hero_weights = range_combos(remove_dead(hero, board))
+    villain_cards, villain_weights = range_combos(remove_dead(villain, board))
+    if not len(hero_cards) or not len(villain_cards):
+        raise ValueError("A range has no combinations left next to the board")
+    # Weight of every hero/villain pair; pairs sharing a card cannot be dealt
+    shared = (hero_cards[:, None, :, None] == villain_cards[None, :, None, :]).any(axis=(2, 3))
+    pair_weights = hero_weights[:, None] * villain_weights[None, :] * ~shared
+    boards = _boards(board, samples, seed)
+    chunk = max(1, PAIR_CHUNK // pair_weights.size)
+    wins = ties = total = 0.0
+    for start in range(0, len(boards), chunk):
+        part = boards[start:start + chunk]
+        hero_blocked = _blocked(hero_cards, part)
+        villain_blocked = _blocked(villain_cards, part)
+        hero_strength = _strengths(hero_cards, part, hero_blocked)
+        villain_strength = _strengths(villain_cards, part, villain_blocked)
+        weights = pair_weights[None] * ~hero_blocked[:, :, None] * ~villain_blocked[:, None, :]
+        diff = hero_strength[:, :, None] - villain_strength[:, None, :]
+        wins += float((weights * (diff > 0)).sum())
+        ties += float((weights * (diff == 0)).sum())
+        total += float(weights.sum())
+    if not total:
+        raise ValueError("The ranges have no combinations that can be dealt together")
+    return {
+        'win': wins / total,
+        'tie': ties / total,
+        'loss': (total - wins - ties) / total,
+        'equity': (wins + ties / 2) / total,
+        'boards': len(boards),
+        'hero_combos': len(hero_cards),
+        'villain_combos': len(villain_cards),
+    }
+
+def range_equity(hero, villain, board=(), samples=BOARD_SAMPLES, seed=0):
+    """Win/tie/loss odds of the hero range against the villain range.
+
+    Ranges are range notation or parse_range() results; the board is 0 to 5
+    integer cards. Every board is played from the flop on; before the flop
+    `samples` boards are drawn from `seed`, so a repeated matchup gives the
+    same answer and comes from the cache. Returns a dict with win, tie,
+    loss, equity, boards, hero_combos and villain_combos.
+    """
+    if isinstance(hero, str):
+        hero = parse_range(hero)
+    if isinstance(villain, str):
+        villain = parse_range(villain)
+    board = tuple(sorted(board))
+    if len(board) > 5 or len(set(board)) != len(board):
+        raise ValueError("The board needs 0 to 5 different cards")
+    return dict(_range_equity(hero, villain, board, samples, seed))
+
+def cache_info():
+    return _range_equity.cache_info()
+
+def main():
+    parser = argparse.ArgumentParser(description="Equity of one hand range against another.")
+    parser.add_argument('hero', help="e.g. 'QQ+, AKs'")
+    parser.add_argument('villain', help="e.g. 'T9s-76s, 22+'")
+    parser.add_argument('--board', default='', help="known community cards, e.g. 2c7d9h")
+    parser.add_argument('--samples', type=int, default=BOARD_SAMPLES, help="boards sampled before the flop")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        board = parse_cards(args.board)
+        hero = parse_range(args.hero, board)
+        villain = parse_range(args.villain, board)
+    except ValueError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    result = range_equity(hero, villain, board, args.samples, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Hero:    {range_size(hero):g} combos of {args.hero}")
+    print(f"Villain: {range_size(villain):g} combos of {args.villain}")
+    print(f"Hero wins:    {result['win']:7.2%}")
+    print(f"Tie:          {result['tie']:7.2%}")
+    print(f"Villain wins: {result['loss']:7.2%}")
+    print(f"Equity:       {result['equity']:7.2%}")
+    print(f"{result['boards']:,} boards in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
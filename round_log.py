@@ -0,0 +1,195 @@
+"""
+Append-only binary log of practice rounds, and offline analysis of it.
+
+Each round is one fixed-size record (31 bytes): when it was played, the
+nine cards in deal order (see cards.py), the actual and guessed hand
+categories of player and dealer, the actual and guessed winner, and the
+seconds taken to name the hands and the winner. Writes go through a
+buffered file opened for appending, so logging costs nothing noticeable
+per round and a crash loses at most the unflushed tail. A record cut
+short by a crash is dropped when the log is next opened for appending, so
+later records stay aligned.
+
+The analysis streams the file in chunks of records, so memory use stays
+the same for a log of any size:
+
+    python3 practice.py --log rounds.log
+    python3 round_log.py analyze rounds.log
+    python3 round_log.py analyze rounds.log --trend week
+"""
+
+import argparse
+import os
+import struct
+import time
+from datetime import datetime
+
+from cards import HAND_OPTIONS
+
+MAGIC = b'RLOG'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')  # magic, version, record size
+# played_at, 9 cards, player/dealer category, player/dealer guess, winner, winner guess,
+# hand seconds, winner seconds
+RECORD = struct.Struct('<d9B4B2B2f')
+CHUNK_RECORDS = 8192
+WRITE_BUFFER = RECORD.size * 2048  # whole records, about 64 KiB
+
+WINNERS = ['player', 'dealer', 'tie']
+
+class RoundLog:
+    """Appends round records to a log file; use as a context manager or close()."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'ab', buffering=WRITE_BUFFER)
+        size = self._file.tell()
+        if size == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            return
+        try:
+            with open(path, 'rb') as f:
+                _read_header(f, path)
+        except ValueError:
+            self._file.close()
+            raise
+        whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+        if whole != size:
+            self._file.truncate(whole)  # a record cut short by a crash
+
+    def append(self, cards, player_category, dealer_category, player_guess, dealer_guess,
+               winner, winner_guess, hand_seconds, winner_seconds, played_at=None):
+        """Log one round. cards are the nine integer cards in deal order."""
+        self._file.write(RECORD.pack(
+            played_at or time.time(), *cards, player_category, dealer_category, player_guess, dealer_guess,
+            WINNERS.index(winner), WINNERS.index(winner_guess), hand_seconds, winner_seconds))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_header(f, path):
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a round log")
+    magic, version, size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or size != RECORD.size:
+        raise ValueError(f"{path} is not a version {VERSION} round log")
+
+def read_records(path, chunk_records=CHUNK_RECORDS):
+    """Yield every record as a tuple (see RECORD), reading one chunk at a time.
+
+    A partly written record at the end of the file is skipped.
+    """
+    with open(path, 'rb') as f:
+        _read_header(f, path)
+        chunk_bytes = RECORD.size * chunk_records
+        while True:
+            chunk = f.read(chunk_bytes)
+            usable = len(chunk) - len(chunk) % RECORD.size
+            yield from RECORD.iter_unpack(chunk[:usable])
+            if len(chunk) < chunk_bytes:
+                return
+
+# --- Analysis ---
+
+def trend_key(played_at, trend):
+    day = datetime.fromtimestamp(played_at)
+    if trend == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02}"
+    if trend == 'month':
+        return day.strftime('%Y-%m')
+    return day.strftime('%Y-%m-%d')
+
+def analyze(path, trend='day'):
+    """One pass over the log; returns the totals that report() prints."""
+    categories = len(HAND_OPTIONS)
+    confusion = [[0] * categories for _ in range(categories)]  # [actual][guessed], both hands
+    hand_seconds = [0.0] * categories  # by the player's actual category
+    hand_rounds = [0] * categories
+    winner_correct = 0
+    rounds = 0
+    trends = {}  # period -> [rounds, correct answers, hand seconds, winner seconds]
+    for record in read_records(path):
+        played_at = record[0]
+        (player_category, dealer_category, player_guess, dealer_guess,
+         winner, winner_guess, seconds_hands, seconds_winner) = record[10:]
+        rounds += 1
+        confusion[player_category][player_guess] += 1
+        confusion[dealer_category][dealer_guess] += 1
+        hand_seconds[player_category] += seconds_hands
+        hand_rounds[player_category] += 1
+        correct = (player_category == player_guess) + (dealer_category == dealer_guess) + (winner == winner_guess)
+        winner_correct += winner == winner_guess
+        period = trends.setdefault(trend_key(played_at, trend), [0, 0, 0.0, 0.0])
+        period[0] += 1
+        period[1] += correct
+        period[2] += seconds_hands
+        period[3] += seconds_winner
+    return {
+        'rounds': rounds,
+        'confusion': confusion,
+        'hand_seconds': hand_seconds,
+        'hand_rounds': hand_rounds,
+        'winner_correct': winner_correct,
+        'trends': trends,
+    }
+
+def report(result):
+    rounds = result['rounds']
+    if not rounds:
+        print("The log has no rounds.")
+        return
+    confusion = result['confusion']
+    print(f"{rounds:,} rounds, winner named correctly {result['winner_correct'] / rounds:.1%}\n")
+
+    print("Hand                  Seen  Accuracy  Avg secs")
+    for category, name in enumerate(HAND_OPTIONS):
+        seen = sum(confusion[category])
+        if not seen:
+            continue
+        timed = result['hand_rounds'][category]
+        average = f"{result['hand_seconds'][category] / timed:8.1f}" if timed else f"{'-':>8}"
+        print(f"{name:16} {seen:9,} {confusion[category][category] / seen:9.1%} {average}")
+    print("(Avg secs: time to name both hands in rounds where yours was that hand)")
+
+    print("\nConfusion matrix: rows are the actual hand, columns your guess")
+    short = ['HC', '1P', '2P', '3K', 'St', 'Fl', 'FH', '4K', 'SF', 'RF']
+    print(f"{'':16}" + ''.join(f" {name:>8}" for name in short))
+    for category, name in enumerate(HAND_OPTIONS):
+        if any(confusion[category]):
+            print(f"{name:16}" + ''.join(f" {count:8,}" for count in confusion[category]))
+
+    print("\nPeriod           Rounds  Accuracy  Hands secs  Winner secs")
+    for period, (count, correct, seconds_hands, seconds_winner) in sorted(result['trends'].items()):
+        print(f"{period:12} {count:10,} {correct / (3 * count):9.1%} {seconds_hands / count:11.1f} "
+              f"{seconds_winner / count:12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a practice round log.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    analyze_parser = sub.add_parser('analyze', help="accuracy, confusion matrix and trends")
+    analyze_parser.add_argument('log')
+    analyze_parser.add_argument('--trend', choices=['day', 'week', 'month'], default='day')
+    args = parser.parse_args()
+
+    if args.command == 'analyze':
+        start = time.perf_counter()
+        try:
+            result = analyze(args.log, args.trend)
+        except ValueError as e:
+            parser.error(str(e))
+        report(result)
+        size = os.path.getsize(args.log)
+        print(f"\nRead {size:,} bytes in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
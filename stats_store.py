@@ -0,0 +1,257 @@
+"""
+Persistent learner statistics shared by practice.py and the web version.
+
+Every finished round is recorded in a SQLite database (WAL mode, so the
+web workers and a command line game can use it at the same time):
+
+- rounds: one row per round, indexed by user and time for histories
+- user_totals and category_totals: running totals kept up to date with
+  every write, so leaderboards and error rates read a few small rows
+  instead of scanning millions of rounds
+
+record() only puts the round on a queue; a background thread writes
+queued rounds in batches, one transaction per batch, so callers never
+wait for the disk. flush() waits until everything queued is written.
+
+    store = StatsStore('stats.db')
+    store.record('alice', player_category=1, dealer_category=2, player_guess=1,
+                 dealer_guess=1, winner='dealer', winner_guess='dealer',
+                 hand_seconds=6.2, winner_seconds=1.5)
+    store.flush()
+    store.category_error_rates('alice')
+
+Reports from the command line:
+
+    python3 stats_store.py stats.db --leaderboard
+    python3 stats_store.py stats.db --user alice
+"""
+
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+
+from cards import HAND_OPTIONS
+
+BATCH_SIZE = 500
+FLUSH_SECONDS = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    played_at REAL NOT NULL,
+    source TEXT,
+    player_category INTEGER NOT NULL,
+    dealer_category INTEGER NOT NULL,
+    player_guess INTEGER,
+    dealer_guess INTEGER,
+    winner TEXT NOT NULL,
+    winner_guess TEXT,
+    hand_seconds REAL,
+    winner_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS rounds_user_time ON rounds (user, played_at);
+CREATE TABLE IF NOT EXISTS user_totals (
+    user TEXT PRIMARY KEY,
+    rounds INTEGER NOT NULL,
+    hand_seconds REAL NOT NULL,
+    winner_seconds REAL NOT NULL,
+    failed_hand_ids INTEGER NOT NULL,
+    failed_winner_ids INTEGER NOT NULL,
+    last_played REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS category_totals (
+    user TEXT NOT NULL,
+    category INTEGER NOT NULL,
+    seen INTEGER NOT NULL,
+    missed INTEGER NOT NULL,
+    PRIMARY KEY (user, category)
+);
+"""
+
+FIELDS = ('user', 'played_at', 'source', 'player_category', 'dealer_category', 'player_guess',
+          'dealer_guess', 'winner', 'winner_guess', 'hand_seconds', 'winner_seconds')
+
+INSERT_ROUND = f"INSERT INTO rounds ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+UPSERT_USER = """
+INSERT INTO user_totals VALUES (?, 1, ?, ?, ?, ?, ?)
+ON CONFLICT (user) DO UPDATE SET
+    rounds = rounds + 1,
+    hand_seconds = hand_seconds + excluded.hand_seconds,
+    winner_seconds = winner_seconds + excluded.winner_seconds,
+    failed_hand_ids = failed_hand_ids + excluded.failed_hand_ids,
+    failed_winner_ids = failed_winner_ids + excluded.failed_winner_ids,
+    last_played = max(last_played, excluded.last_played)
+"""
+UPSERT_CATEGORY = """
+INSERT INTO category_totals VALUES (?, ?, 1, ?)
+ON CONFLICT (user, category) DO UPDATE SET
+    seen = seen + 1,
+    missed = missed + excluded.missed
+"""
+
+class StatsStore:
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._connect().executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name='stats-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        # One connection per thread, as in session_store.SQLiteStore
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- Writing ---
+
+    def record(self, user, player_category, dealer_category, player_guess, dealer_guess,
+               winner, winner_guess, hand_seconds=0.0, winner_seconds=0.0, source=None, played_at=None):
+        """Queue one finished round for writing."""
+        self._queue.put((user, played_at or time.time(), source, player_category, dealer_category,
+                         player_guess, dealer_guess, winner, winner_guess, hand_seconds or 0.0,
+                         winner_seconds or 0.0))
+
+    def flush(self):
+        """Block until every round recorded so far is in the database."""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception:
+                # Statistics are best effort: report and drop the batch rather than stop the writer
+                traceback.print_exc()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        users = []
+        categories = []
+        for row in batch:
+            (user, played_at, _, player_category, dealer_category, player_guess, dealer_guess,
+             winner, winner_guess, hand_seconds, winner_seconds) = row
+            player_missed = int(player_guess != player_category)
+            dealer_missed = int(dealer_guess != dealer_category)
+            users.append((user, hand_seconds, winner_seconds, player_missed + dealer_missed,
+                          int(winner_guess != winner), played_at))
+            categories.append((user, player_category, player_missed))
+            categories.append((user, dealer_category, dealer_missed))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(INSERT_ROUND, batch)
+            conn.executemany(UPSERT_USER, users)
+            conn.executemany(UPSERT_CATEGORY, categories)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- Queries ---
+
+    def user_totals(self, user):
+        """Totals for one user as a dict, or None if they have no rounds."""
+        row = self._connect().execute(
+            "SELECT rounds, hand_seconds, winner_seconds, failed_hand_ids, failed_winner_ids, last_played "
+            "FROM user_totals WHERE user = ?", (user,)).fetchone()
+        if row is None:
+            return None
+        keys = ('rounds', 'hand_seconds', 'winner_seconds', 'failed_hand_ids', 'failed_winner_ids', 'last_played')
+        return dict(zip(keys, row))
+
+    def history(self, user, limit=50, before=None):
+        """The user's most recent rounds, newest first, as dicts.
+
+        Pass the played_at of the last round seen as `before` for the next page.
+        """
+        sql = f"SELECT {', '.join(FIELDS[1:])} FROM rounds WHERE user = ?"
+        params = [user]
+        if before is not None:
+            sql += " AND played_at < ?"
+            params.append(before)
+        sql += " ORDER BY played_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(zip(FIELDS[1:], row)) for row in self._connect().execute(sql, params)]
+
+    def category_error_rates(self, user=None):
+        """{category: (seen, missed, error rate)} for one user, or for everybody."""
+        if user is None:
+            rows = self._connect().execute(
+                "SELECT category, SUM(seen), SUM(missed) FROM category_totals GROUP BY category")
+        else:
+            rows = self._connect().execute(
+                "SELECT category, seen, missed FROM category_totals WHERE user = ?", (user,))
+        return {category: (seen, missed, missed / seen) for category, seen, missed in rows}
+
+    def leaderboard(self, limit=10, min_rounds=10):
+        """Users with at least `min_rounds` rounds, fewest mistakes per round first.
+
+        Each entry is (user, rounds, mistakes per round, average seconds per round).
+        """
+        return self._connect().execute(
+            "SELECT user, rounds, (failed_hand_ids + failed_winner_ids) * 1.0 / rounds AS mistakes, "
+            "(hand_seconds + winner_seconds) / rounds AS seconds "
+            "FROM user_totals WHERE rounds >= ? ORDER BY mistakes, seconds LIMIT ?",
+            (min_rounds, limit)).fetchall()
+
+def report_user(store, user):
+    totals = store.user_totals(user)
+    if totals is None:
+        print(f"No rounds recorded for {user}.")
+        return
+    rounds = totals['rounds']
+    print(f"{user}: {rounds:,} rounds, {totals['failed_hand_ids']:,} failed hand IDs, "
+          f"{totals['failed_winner_ids']:,} failed winner IDs")
+    print(f"Average time: {totals['hand_seconds'] / rounds:.1f}s hands, {totals['winner_seconds'] / rounds:.1f}s winner")
+    print("\nHand              Seen   Missed  Error rate")
+    for category, (seen, missed, rate) in sorted(store.category_error_rates(user).items()):
+        print(f"{HAND_OPTIONS[category]:16} {seen:6,} {missed:8,} {rate:10.1%}")
+
+def report_leaderboard(store, limit, min_rounds):
+    print("Rank  User                 Rounds  Mistakes/round  Seconds/round")
+    for rank, (user, rounds, mistakes, seconds) in enumerate(store.leaderboard(limit, min_rounds), 1):
+        print(f"{rank:4}  {user:20} {rounds:6,} {mistakes:15.2f} {seconds:14.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Report learner statistics.")
+    parser.add_argument('db', help="statistics database")
+    parser.add_argument('--user', help="show one user's totals and error rates")
+    parser.add_argument('--leaderboard', action='store_true')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--min-rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    store = StatsStore(args.db)
+    if args.user:
+        report_user(store, args.user)
+    if args.leaderboard or not args.user:
+        if args.user:
+            print()
+        report_leaderboard(store, args.limit, args.min_rounds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Headless Texas Hold'em table simulator for 2 to 10 seats.
+
+Each hand deals hole cards to every seat and five community cards from a
+single deck (see dealer.py), asks each seat's policy whether to call or fold, and settles
+the pot at showdown, splitting it between tied seats. There is no
+betting beyond that one decision: every seat posts an ante, every seat
+that calls puts in the bet, and the best hand among the callers takes
+the pot.
+
+A policy is a function policy(seat, hole_cards, seats) returning True to
+call and False to fold. hole_cards are two integer cards (see cards.py).
+Policies named in POLICIES can be used from the command line and with
+worker processes.
+
+    python3 table_sim.py --seats 6 --hands 1000000 --policy tight --workers 4
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dealer import Dealer
+from evaluator import board_sums, strength_with_board
+
+MIN_SEATS = 2
+MAX_SEATS = 10
+ANTE = 1
+BET = 10
+CHUNK_HANDS = 50000
+
+# --- Policies ---
+
+def always_call(seat, hole_cards, seats):
+    return True
+
+def tight(seat, hole_cards, seats):
+    """Play pairs, two cards ten or better, and suited aces."""
+    high, low = sorted((hole_cards[0] >> 2, hole_cards[1] >> 2), reverse=True)
+    if high == low or low >= 8:
+        return True
+    return high == 12 and (hole_cards[0] & 3) == (hole_cards[1] & 3)
+
+def loose(seat, hole_cards, seats):
+    """Play any pair, any ace or king, and suited or connected cards."""
+    high, low = sorted((hole_cards[0] >> 2, hole_cards[1] >> 2), reverse=True)
+    if high == low or high >= 11:
+        return True
+    return (hole_cards[0] & 3) == (hole_cards[1] & 3) or high - low == 1
+
+POLICIES = {
+    'call': always_call,
+    'tight': tight,
+    'loose': loose,
+}
+
+# --- Simulation ---
+
+def new_stats(seats):
+    return {
+        'hands': 0,
+        'showdowns': 0,
+        'split_pots': 0,
+        'net': [0] * seats,
+        'wins': [0] * seats,
+        'folds': [0] * seats,
+        'elapsed': 0.0,
+    }
+
+def merge_stats(total, part):
+    for key in ('hands', 'showdowns', 'split_pots', 'elapsed'):
+        total[key] += part[key]
+    for key in ('net', 'wins', 'folds'):
+        total[key] = [a + b for a, b in zip(total[key], part[key])]
+    return total
+
+def simulate(seats, hands, policies=None, seed=None, ante=ANTE, bet=BET):
+    """Play `hands` hands at a table of `seats`; returns a stats dict.
+
+    policies is one policy per seat (default: everybody calls).
+    """
+    if not MIN_SEATS <= seats <= MAX_SEATS:
+        raise ValueError(f"A table has {MIN_SEATS} to {MAX_SEATS} seats")
+    policies = policies or [always_call] * seats
+    dealer = Dealer(seed)
+    dealt = 2 * seats + 5
+    stats = new_stats(seats)
+    net = stats['net']
+    wins = stats['wins']
+    folds = stats['folds']
+    start = time.perf_counter()
+    for _ in range(hands):
+        deck = dealer.deal(dealt)
+        board = deck[2 * seats:]
+        sums = board_sums(board)
+        pot = ante * seats
+        best = -1
+        winners = []
+        callers = 0
+        for seat in range(seats):
+            net[seat] -= ante
+            hole = deck[2 * seat:2 * seat + 2]
+            if not policies[seat](seat, hole, seats):
+                folds[seat] += 1
+                continue
+            callers += 1
+            net[seat] -= bet
+            pot += bet
+            strength = strength_with_board(hole, board, sums)
+            if strength > best:
+                best = strength
+                winners = [seat]
+            elif strength == best:
+                winners.append(seat)
+        if not winners:
+            # Everybody folded: antes go back
+            for seat in range(seats):
+                net[seat] += ante
+            continue
+        if callers > 1:
+            stats['showdowns'] += 1
+        if len(winners) > 1:
+            stats['split_pots'] += 1
+        share, odd = divmod(pot, len(winners))
+        for seat in winners:
+            net[seat] += share
+            wins[seat] += 1
+        net[winners[0]] += odd  # odd chip to the first winner
+    stats['hands'] = hands
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+def _simulate_chunk(seats, hands, policy_names, seed):
+    return simulate(seats, hands, [POLICIES[name] for name in policy_names], seed)
+
+def simulate_parallel(seats, hands, policy_names=None, workers=None, seed=None):
+    """Run simulate() over worker processes with named policies.
+
+    Every chunk of hands gets its own seed derived from `seed`, so the
+    same seed and chunk size give the same result with any worker count.
+    """
+    policy_names = policy_names or ['call'] * seats
+    sizes = [CHUNK_HANDS] * (hands // CHUNK_HANDS)
+    if hands % CHUNK_HANDS:
+        sizes.append(hands % CHUNK_HANDS)
+    seeds = [None if seed is None else f"{seed}:{i}" for i in range(len(sizes))]
+    total = new_stats(seats)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        for part in pool.map(_simulate_chunk, [seats] * len(sizes), sizes,
+                             [policy_names] * len(sizes), seeds):
+            merge_stats(total, part)
+    total['wall'] = time.perf_counter() - start
+    return total
+
+def report(stats, policy_names):
+    # elapsed is summed over workers, so this is the rate of one core
+    per_core = stats['hands'] / stats['elapsed'] if stats['elapsed'] else 0
+    print(f"{stats['hands']:,} hands, {stats['showdowns']:,} showdowns, {stats['split_pots']:,} split pots")
+    print(f"{per_core:,.0f} hands/sec per core", end='')
+    if 'wall' in stats:
+        print(f", {stats['hands'] / stats['wall']:,.0f} hands/sec overall", end='')
+    print()
+    print("\nSeat  Policy   Wins      Folds     Net chips  Chips/hand")
+    for seat, name in enumerate(policy_names):
+        print(f"{seat + 1:4}  {name:7} {stats['wins'][seat]:9,} {stats['folds'][seat]:9,} "
+              f"{stats['net'][seat]:12,} {stats['net'][seat] / stats['hands']:10.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many hands at a 2-10 seat table.")
+    parser.add_argument('--seats', type=int, default=6)
+    parser.add_argument('--hands', type=int, default=100000)
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                        help="policy per seat (repeat for each seat); one value applies to all")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    policy_names = args.policy or ['call']
+    if len(policy_names) == 1:
+        policy_names = policy_names * args.seats
+    if len(policy_names) != args.seats:
+        parser.error("give one --policy, or one per seat")
+    if args.workers > 1:
+        stats = simulate_parallel(args.seats, args.hands, policy_names, args.workers, args.seed)
+    else:
+        stats = simulate(args.seats, args.hands, [POLICIES[name] for name in policy_names], args.seed)
+    report(stats, policy_names)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The game modules are scripts at the top of the repo and in web_practice/, not a package
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'web_practice')]
+# Reproducible deals, and no round pool thread dealing behind the tests
+os.environ.setdefault('DEAL_SEED', '1')
+os.environ.setdefault('ROUND_POOL_HIGH', '0')
+
+ANSWERS = {'start_hand_time': '0', 'start_winner_time': '0',
+           'player_hand': '1', 'dealer_hand': '1', 'winner': 'player'}
+
+@pytest.fixture
+def client():
+    pytest.importorskip('flask')
+    from app import app
+    with app.test_client() as client:
+        client.get('/')
+        yield client
+
+def play_round(client):
+    """Deal a round, answer its quiz and return the /result response."""
+    client.get('/new_round')
+    client.post('/quiz', data=ANSWERS)
+    return client.get('/result')
@@ -0,0 +1,54 @@
+import pytest
+
+from cards import parse_cards
+from evaluator import strength_cards
+
+def test_evaluate(client):
+    response = client.post('/api/evaluate', json={'hands': ['AsKsQsJsTs9c2d', [0, 5, 10, 15, 20]]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert body['results'][0] == [9, strength_cards(parse_cards('AsKsQsJsTs9c2d'))]
+    assert body['results'][1][1] == strength_cards([0, 5, 10, 15, 20])
+
+def test_compare(client):
+    response = client.post('/api/compare', json={'rounds': ['AsAh KdKc 2c3d4h9s9c']})
+    assert response.get_json()['results'] == [['player', 2, 2]]
+
+@pytest.mark.parametrize('body', ['not json', '[]', '{"hand": []}', '{"hands": "AsKs"}'])
+def test_needs_a_hands_list(client, body):
+    response = client.post('/api/evaluate', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert 'hands' in response.get_json()['error']
+
+@pytest.mark.parametrize('hand', [
+    'AsKsQs',  # too few cards
+    'AsKsQsJsTs9c2d3d',  # too many
+    'AsAsQsJsTs',  # the same card twice
+    'AsKsQsJsXx',
+    [0, 1, 2, 3, 52],
+    [0, 1, 2, 3, -1],
+    [0, 1, 2, 3, 4.0],
+    [0, 1, 2, 3, True],
+    [0, 1, 2, 3, '4'],
+])
+def test_bad_hands_are_refused(client, hand):
+    response = client.post('/api/evaluate', json={'hands': [hand]})
+    assert response.status_code == 400
+    assert 'Bad hand' in response.get_json()['error']
+
+def test_rounds_need_nine_cards(client):
+    response = client.post('/api/compare', json={'rounds': ['AsAh KdKc 2c3d4h9s']})
+    assert response.status_code == 400
+
+def test_too_many_hands(client, monkeypatch):
+    import api
+    monkeypatch.setattr(api, 'API_MAX_HANDS', 2)
+    response = client.post('/api/evaluate', json={'hands': ['AsKsQsJsTs'] * 3})
+    assert response.status_code == 413
+
+def test_too_large_body(client):
+    import api
+    response = client.post('/api/evaluate', data=b' ' * (api.API_MAX_BYTES + 1),
+                           content_type='application/json')
+    assert response.status_code == 413
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from cards import (DECK, ROUND_NUMBERS, parse_card, parse_cards, parse_round_token, round_cards,
+                   round_number, round_token, to_ints)
+
+def test_round_tokens_round_trip():
+    rng = random.Random(1)
+    for _ in range(1000):
+        cards = rng.sample(range(52), 9)
+        token = round_token(cards)
+        assert len(token) == 10
+        assert parse_round_token(token) == cards
+
+def test_round_numbers_cover_every_deal():
+    assert round_cards(0) == list(range(9))
+    assert round_cards(ROUND_NUMBERS - 1) == list(range(51, 42, -1))
+    assert round_number(round_cards(ROUND_NUMBERS - 1)) == ROUND_NUMBERS - 1
+
+@pytest.mark.parametrize('token', [
+    '',
+    'AAAAAAAAA',
+    'AAAAAAAAAAAA',
+    '__________',  # beyond the last round
+    'AAAAAAAAAB',  # the same bytes as AAAAAAAAAA, spelled differently
+    'AAAA AAAAA',
+    'AAAAAAAAA=',
+])
+def test_bad_round_tokens_are_refused(token):
+    with pytest.raises(ValueError):
+        parse_round_token(token)
+
+def test_round_needs_nine_different_cards():
+    with pytest.raises(ValueError):
+        round_number([0] * 9)
+    with pytest.raises(ValueError):
+        round_number(list(range(8)))
+
+def test_card_notations():
+    assert parse_card('As') == DECK.index('Ace of Spades') == 48
+    assert parse_card('10d') == parse_card('Td') == DECK.index('10 of Diamonds')
+    assert parse_cards('2c 7d,9h') == [parse_card('2c'), parse_card('7d'), parse_card('9h')]
+    assert to_ints(['Ace of Spades', 'Ks', 3]) == [48, parse_card('Ks'), 3]
+    with pytest.raises(ValueError):
+        parse_card('1x')
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from cards import HAND_OPTIONS
+from drills import NEVER_DEALT, _round_index, deal_category, deal_drill, parse_category, parse_drill
+from evaluator import hand_category, strength_cards
+
+@pytest.mark.parametrize('category', range(len(HAND_OPTIONS)))
+def test_deal_category(category):
+    rng = random.Random(category)
+    for _ in range(50):
+        hand = deal_category(category, rng)
+        assert len(set(hand)) == 7
+        assert hand_category(strength_cards(hand)) == category
+
+def test_dealer_any_hand():
+    rng = random.Random(1)
+    for _ in range(50):
+        player_hand, dealer_hand, community_cards = deal_drill(6, None, rng)
+        assert len(set(player_hand + dealer_hand + community_cards)) == 9
+        assert hand_category(strength_cards(player_hand + community_cards)) == 6
+
+# Indexing a pair takes about a second the first time
+@pytest.mark.parametrize('player, dealer', [(7, 9), (9, 7), (1, 2), (5, 5)])
+def test_deal_both_categories(player, dealer):
+    rng = random.Random(player * 10 + dealer)
+    for _ in range(50):
+        player_hand, dealer_hand, community_cards = deal_drill(player, dealer, rng)
+        assert len(set(player_hand + dealer_hand + community_cards)) == 9
+        assert hand_category(strength_cards(player_hand + community_cards)) == player
+        assert hand_category(strength_cards(dealer_hand + community_cards)) == dealer
+
+def test_never_dealt_pairs_have_no_rounds():
+    for player, dealer in NEVER_DEALT:
+        if player <= dealer:
+            assert _round_index(player, dealer) == ([], [])
+        with pytest.raises(ValueError):
+            deal_drill(player, dealer)
+
+def test_parse_drill():
+    assert parse_drill('Full-House', 'flush') == (6, 5)
+    assert parse_drill('straight_flush') == (8, None)
+    assert parse_category('9') == 9
+    with pytest.raises(ValueError, match="cannot be dealt"):
+        parse_drill('High Card', 'Four of a Kind')
+    with pytest.raises(ValueError, match="Unknown hand category"):
+        parse_drill('Five of a Kind')
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from cards import DECK, parse_cards
+from evaluator import (board_sums, compare_hands, compare_strengths, evaluate_cards, evaluate_hand,
+                       evaluate_hand_reference, hand_category, pack_strength, strength_cards,
+                       strength_with_board)
+
+def test_tables_match_reference():
+    rng = random.Random(7)
+    for _ in range(3000):
+        cards = rng.sample(range(52), rng.choice((5, 6, 7)))
+        strings = [DECK[card] for card in cards]
+        expected = evaluate_hand_reference(strings)
+        assert evaluate_cards(cards) == expected
+        assert evaluate_hand(strings) == expected
+        assert strength_cards(cards) == pack_strength(*expected)
+
+def test_board_sums_match_full_hand():
+    rng = random.Random(8)
+    for _ in range(1000):
+        cards = rng.sample(range(52), 7)
+        board = cards[2:]
+        assert strength_with_board(cards[:2], board, board_sums(board)) == strength_cards(cards)
+
+@pytest.mark.parametrize('hand, category', [
+    ('AsKsQsJsTs', 9),
+    ('9h8h7h6h5h2c3d', 8),
+    ('5d4d3d2dAd', 8),  # the wheel
+    ('AsAhAdAcKs', 7),
+    ('AsAhAdKcKs2c', 6),
+    ('As9s7s5s2sKhKd', 5),
+    ('As2d3c4h5s', 4),
+    ('AsAhAd7c2s', 3),
+    ('AsAhKdKc2s', 2),
+    ('AsAh9d7c2s', 1),
+    ('AsJh9d7c2s', 0),
+])
+def test_categories(hand, category):
+    cards = parse_cards(hand)
+    assert hand_category(strength_cards(cards)) == category
+    assert evaluate_hand_reference([DECK[card] for card in cards])[0] == category
+
+def test_comparisons_agree():
+    rng = random.Random(9)
+    for _ in range(1000):
+        player = rng.sample(range(52), 7)
+        dealer = rng.sample(range(52), 7)
+        assert (compare_hands(evaluate_cards(player), evaluate_cards(dealer))
+                == compare_strengths(strength_cards(player), strength_cards(dealer)))
+
+def test_kicker_decides():
+    board = parse_cards('AsAh9d7c2s')
+    assert compare_strengths(strength_cards(parse_cards('Kd3c') + board),
+                             strength_cards(parse_cards('Qd3h') + board)) == 'player'
+    # Both play the board
+    assert compare_strengths(strength_cards(parse_cards('3d4c') + parse_cards('AsKsQsJsTs')),
+                             strength_cards(parse_cards('2d5c') + parse_cards('AsKsQsJsTs'))) == 'tie'
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from cards import parse_cards
+from ranges import combo_names, parse_range, range_equity, range_size
+
+@pytest.mark.parametrize('text, size', [
+    ('AA', 6),
+    ('AKs', 4),
+    ('AKo', 12),
+    ('AK', 16),
+    ('QQ+', 18),
+    ('22+', 78),
+    ('A2s+', 48),
+    ('JJ-88', 24),
+    ('T9s-76s', 16),
+    ('AsKs', 1),
+    ('AA, AKs', 10),
+    ('QQ+:0.5', 9),
+])
+def test_range_sizes(text, size):
+    assert range_size(parse_range(text)) == size
+
+def test_later_terms_set_the_weight():
+    assert parse_range('AA:0.5, AsAh') == ((1.0, parse_range('AsAh')[0][1]),
+                                           (0.5, parse_range('AA')[0][1] & ~parse_range('AsAh')[0][1]))
+
+def test_dead_cards_are_removed():
+    assert range_size(parse_range('AA', dead=parse_cards('As'))) == 3
+    assert combo_names(parse_range('AKs', dead=parse_cards('AhAdAc'))) == ['AsKs']
+
+@pytest.mark.parametrize('text', ['AX', 'AAs', 'AKs-QJo', 'AA:-1', 'AsAs', 'KQ-72'])
+def test_bad_ranges_are_refused(text):
+    with pytest.raises(ValueError):
+        parse_range(text)
+
+def test_equity_on_the_river_is_exact():
+    board = tuple(parse_cards('2c7d9hJsQs'))
+    result = range_equity(parse_range('AA'), parse_range('KK'), board)
+    assert result['win'] == 1.0 and result['boards'] == 1
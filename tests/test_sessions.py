@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip('flask')
+
+from flask import Flask, session
+
+import session_store
+from session_store import MemoryStore, SQLiteStore
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore(max_entries=3)
+    return SQLiteStore(str(tmp_path / 'sessions.db'))
+
+def test_store_round_trip(store):
+    store.set('a', {'round': 'AB3kq0Xz9Q', 'stats': {'total_rounds': 1}}, 60)
+    assert store.get('a') == {'round': 'AB3kq0Xz9Q', 'stats': {'total_rounds': 1}}
+    assert store.get('b') is None
+    store.delete('a')
+    assert store.get('a') is None
+
+def test_store_expires(store):
+    store.set('a', {'x': 1}, -1)
+    assert store.get('a') is None
+
+def test_store_keeps_its_own_copy(store):
+    data = {'stats': {'total_rounds': 1}}
+    store.set('a', data, 60)
+    data['stats']['total_rounds'] = 2
+    store.get('a')['stats']['total_rounds'] = 3
+    assert store.get('a') == {'stats': {'total_rounds': 1}}
+
+def test_memory_store_drops_least_recently_used():
+    store = MemoryStore(max_entries=2)
+    store.set('a', {}, 60)
+    store.set('b', {}, 60)
+    store.get('a')
+    store.set('c', {}, 60)
+    assert store.get('b') is None
+    assert store.get('a') == {} and store.get('c') == {}
+
+@pytest.mark.parametrize('backend', ['cookie', 'memory', 'sqlite'])
+def test_backends_keep_the_session(backend, tmp_path, monkeypatch):
+    monkeypatch.setenv('SESSION_DB', str(tmp_path / 'sessions.db'))
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    session_store.init_app(app, backend)
+
+    @app.route('/count')
+    def count():
+        session['stats'] = stats = session.get('stats', {'count': 0})
+        stats['count'] += 1
+        return str(stats['count'])
+
+    @app.route('/clear')
+    def clear():
+        session.clear()
+        return ''
+
+    client = app.test_client()
+    assert [client.get('/count').text for _ in range(3)] == ['1', '2', '3']
+    if backend != 'cookie':
+        # Only the id travels in the cookie
+        assert len(client.get_cookie('session').value) < 64
+    client.get('/clear')
+    assert client.get('/count').text == '1'
+    assert app.test_client().get('/count').text == '1'
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        session_store.init_app(Flask(__name__), 'redis')
@@ -0,0 +1,42 @@
+from conftest import ANSWERS, play_round
+
+def money(client):
+    with client.session_transaction() as session:
+        return session['player_money'], session['dealer_money'], session['stats']['total_rounds']
+
+def test_result_pays_out_once(client):
+    assert play_round(client).status_code == 200
+    settled = money(client)
+    assert settled[0] + settled[1] == 200
+    assert settled[2] == 1
+    # Refreshing the result page, or answering the quiz again, changes nothing
+    client.get('/result')
+    client.post('/quiz', data=ANSWERS)
+    client.get('/result')
+    assert money(client) == settled
+
+def test_every_round_pays_out(client):
+    for rounds in range(1, 4):
+        play_round(client)
+        player_money, dealer_money, total_rounds = money(client)
+        assert player_money + dealer_money == 200
+        assert total_rounds == rounds
+
+def test_replays_are_new_rounds(client):
+    play_round(client)
+    with client.session_transaction() as session:
+        token = session['round']
+    client.get(f'/round/{token}')
+    with client.session_transaction() as session:
+        assert session['round'] == token
+    client.post('/quiz', data=ANSWERS)
+    client.get('/result')
+    client.get('/result')
+    assert money(client)[2] == 2
+
+def test_lost_round_goes_back_to_start(client):
+    with client.session_transaction() as session:
+        session.pop('round', None)
+    assert client.get('/result').status_code == 302
+    assert client.get('/quiz').status_code == 302
+    assert client.get('/round/not-a-token').status_code == 404
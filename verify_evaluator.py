@@ -0,0 +1,166 @@
+"""
+Exhaustive check of the table evaluator over all 133,784,560 seven-card hands.
+
+Every 7-card combination has an index in the combinatorial number system
+(colex order), so the index range is cut into chunks and handed to a
+process pool. A worker turns its start index back into a combination and
+steps to the next combination in place, never building a list of hands.
+It counts hand categories with evaluator.strength_cards() and, every
+--sample-every hands, also checks the result against the original
+evaluate_hand_reference().
+
+Finished chunks are written to a checkpoint file, so an interrupted run
+picks up where it stopped when started again with the same file. At the
+end the category totals are compared with the known frequencies.
+
+    python3 verify_evaluator.py --workers 8
+    python3 verify_evaluator.py --max-chunks 4      # quick partial run
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import comb
+
+from cards import DECK, HAND_OPTIONS
+from evaluator import CATEGORY_SHIFT, evaluate_cards, evaluate_hand_reference, hand_category, strength_cards
+
+HAND_SIZE = 7
+TOTAL = comb(52, HAND_SIZE)
+CHUNK_SIZE = 2_000_000
+SAMPLE_EVERY = 997
+CHECKPOINT = 'verify_checkpoint.json'
+
+# Number of 7-card hands in each category
+EXPECTED_COUNTS = [
+    23_294_460, 58_627_800, 31_433_400, 6_461_620, 6_180_020,
+    4_047_644, 3_473_184, 224_848, 37_260, 4_324,
+]
+
+def combination_at(index, k=HAND_SIZE):
+    """The combination with this colex index: sorted cards c with sum(comb(c[i], i + 1)) == index."""
+    cards = [0] * k
+    for i in range(k, 0, -1):
+        card = i - 1
+        while comb(card + 1, i) <= index:
+            card += 1
+        cards[i - 1] = card
+        index -= comb(card, i)
+    return cards
+
+def combination_index(cards):
+    return sum(comb(card, i + 1) for i, card in enumerate(sorted(cards)))
+
+def next_combination(cards, n=52):
+    """Advance a sorted combination to the next one in colex order, in place."""
+    k = len(cards)
+    for i in range(k):
+        limit = cards[i + 1] if i + 1 < k else n
+        if cards[i] + 1 < limit:
+            cards[i] += 1
+            for j in range(i):
+                cards[j] = j
+            return True
+    return False
+
+def verify_chunk(chunk, start, count, sample_every=SAMPLE_EVERY):
+    """Categorise `count` hands from index `start`; spot-check against the reference."""
+    began = time.perf_counter()
+    counts = [0] * 10
+    checked = 0
+    mismatches = []
+    cards = combination_at(start)
+    for n in range(count):
+        category = strength_cards(cards) >> CATEGORY_SHIFT
+        counts[category] += 1
+        if n % sample_every == 0:
+            expected = evaluate_hand_reference([DECK[card] for card in cards])
+            if evaluate_cards(cards) != expected or hand_category(strength_cards(cards)) != expected[0]:
+                mismatches.append(list(cards))
+            checked += 1
+        next_combination(cards)
+    return {
+        'chunk': chunk,
+        'counts': counts,
+        'checked': checked,
+        'mismatches': mismatches[:10],
+        'elapsed': time.perf_counter() - began,
+        'worker': os.getpid(),
+    }
+
+def load_checkpoint(path, chunk_size):
+    if not os.path.exists(path):
+        return {'chunk_size': chunk_size, 'chunks': {}}
+    with open(path) as f:
+        state = json.load(f)
+    if state['chunk_size'] != chunk_size:
+        sys.exit(f"{path} was written with --chunk-size {state['chunk_size']}")
+    return state
+
+def save_checkpoint(path, state):
+    # Write then rename so a crash never leaves a half-written checkpoint
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+def run(workers=None, chunk_size=CHUNK_SIZE, checkpoint=CHECKPOINT, sample_every=SAMPLE_EVERY,
+        max_chunks=None):
+    state = load_checkpoint(checkpoint, chunk_size)
+    chunks = [(i, start, min(chunk_size, TOTAL - start))
+              for i, start in enumerate(range(0, TOTAL, chunk_size))
+              if str(i) not in state['chunks']]
+    if max_chunks is not None:
+        chunks = chunks[:max_chunks]
+    print(f"{len(state['chunks'])} chunks already done, {len(chunks)} to go")
+    per_worker = {}
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(verify_chunk, i, start, count, sample_every) for i, start, count in chunks]
+        for future in as_completed(futures):
+            result = future.result()
+            state['chunks'][str(result['chunk'])] = result
+            save_checkpoint(checkpoint, state)
+            done, elapsed = per_worker.get(result['worker'], (0, 0.0))
+            per_worker[result['worker']] = (done + sum(result['counts']), elapsed + result['elapsed'])
+            print(f"chunk {result['chunk']:4}: {sum(result['counts']) / result['elapsed']:12,.0f} hands/s "
+                  f"(worker {result['worker']}, {len(state['chunks'])} chunks done)")
+    for worker, (done, elapsed) in sorted(per_worker.items()):
+        print(f"worker {worker}: {done:,} hands at {done / elapsed:,.0f} hands/s")
+    return report(state)
+
+def report(state):
+    """Print totals against the known frequencies; True when everything checks out."""
+    results = state['chunks'].values()
+    totals = [sum(r['counts'][c] for r in results) for c in range(10)]
+    checked = sum(r['checked'] for r in results)
+    mismatches = [hand for r in results for hand in r['mismatches']]
+    seen = sum(totals)
+    print(f"\n{seen:,} of {TOTAL:,} hands evaluated, {checked:,} checked against the reference")
+    for category, name in enumerate(HAND_OPTIONS):
+        print(f"{name:16} {totals[category]:12,}  expected {EXPECTED_COUNTS[category]:12,}")
+    for hand in mismatches:
+        print("MISMATCH:", [DECK[card] for card in hand])
+    ok = not mismatches
+    if seen == TOTAL:
+        ok = ok and totals == EXPECTED_COUNTS
+        print("PASS" if ok else "FAIL")
+    else:
+        print("Partial run: " + ("no mismatches so far" if ok else "FAIL"))
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the evaluator against every 7-card hand.")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--checkpoint', default=CHECKPOINT)
+    parser.add_argument('--sample-every', type=int, default=SAMPLE_EVERY,
+                        help="check every Nth hand against the reference evaluator")
+    parser.add_argument('--max-chunks', type=int, default=None, help="stop after this many new chunks")
+    args = parser.parse_args()
+    ok = run(args.workers, args.chunk_size, args.checkpoint, args.sample_every, args.max_chunks)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
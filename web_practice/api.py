@@ -0,0 +1,164 @@
+"""
+JSON API for grading many hands in one request.
+
+POST /api/evaluate
+    {"hands": ["AsKsQsJsTs9c2d", [0, 5, 10, 15, 20], ...]}
+
+    Each hand is 5 to 7 cards, either as short notation ("As", "Td" or
+    "10d", written together or with spaces) or as integer cards
+    (rank * 4 + suit, see cards.py). The answer lists [category, strength]
+    per hand, where category indexes "names" (the quiz's HAND_OPTIONS) and
+    a higher strength is a better hand, like evaluate_hand() and
+    compare_hands():
+
+    {"count": 2, "names": [...], "results": [[9, 10411194], [0, 480306]], "elapsed_ms": 0.2}
+
+POST /api/compare
+    {"rounds": ["AsKd QhQc 2c3d4h5s9c", [p1, p2, d1, d2, b1, b2, b3, b4, b5], ...]}
+
+    Each round is nine cards in deal order: player hole cards, dealer hole
+    cards, then the five community cards. The answer lists
+    [winner, player category, dealer category] per round, with winner one
+    of "player", "dealer" or "tie".
+
+Batches are evaluated with the NumPy batch evaluator when it is installed
+and every hand has the same number of cards. Batches larger than
+STREAM_MIN are evaluated and sent in chunks, so the response starts at
+once and the server never holds the whole answer; elapsed_ms then comes
+last in the body. Requests over API_MAX_BYTES (chunked ones included) or
+with more than API_MAX_HANDS hands are refused with 413.
+"""
+
+import json
+import os
+import time
+
+from flask import Blueprint, Response, jsonify, request
+
+# The game modules come from the parent directory, which app.py puts on sys.path
+from cards import HAND_OPTIONS, parse_cards
+from dealer import ROUND_CARDS
+from evaluator import (CATEGORY_SHIFT, MAX_CARDS, MIN_CARDS, compare_strengths, strength_cards)
+
+try:
+    import numpy as np
+    from batch_eval import strength_batch
+except ImportError:
+    np = None
+
+API_MAX_BYTES = int(os.environ.get('API_MAX_BYTES', 8 * 1024 * 1024))
+API_MAX_HANDS = int(os.environ.get('API_MAX_HANDS', 200000))
+STREAM_MIN = 10000
+CHUNK = 10000
+BATCH_MIN = 64  # below this NumPy's per-call overhead outweighs the per-hand savings
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+class BadRequest(ValueError):
+    pass
+
+@api.errorhandler(BadRequest)
+def bad_request(error):
+    return jsonify({'error': str(error)}), 400
+
+@api.record_once
+def limit_body(state):
+    # Werkzeug stops reading the body here, so chunked requests without a
+    # Content-Length cannot send more; read_batch() refuses a body that reaches
+    # it. It is app wide, so a smaller limit already set is kept.
+    limit = state.app.config.get('MAX_CONTENT_LENGTH')
+    if limit is None or limit > API_MAX_BYTES + 1:
+        state.app.config['MAX_CONTENT_LENGTH'] = API_MAX_BYTES + 1
+
+@api.errorhandler(413)
+def too_large(error=None):
+    return jsonify({'error': f"At most {API_MAX_BYTES:,} bytes and {API_MAX_HANDS:,} hands per request"}), 413
+
+@api.before_request
+def limit_size():
+    # Refuse early when the client says up front that the body is too big
+    if request.content_length is not None and request.content_length > API_MAX_BYTES:
+        return too_large()
+
+def parse_card(card):
+    if type(card) is not int or not 0 <= card < 52:  # no floats, no booleans
+        raise ValueError(f"{card!r} is not a card number 0-51")
+    return card
+
+def parse_hand(item, sizes):
+    """Integer cards for one hand, given as short notation or a list of ints."""
+    try:
+        cards = parse_cards(item) if isinstance(item, str) else [parse_card(card) for card in item]
+    except (TypeError, ValueError) as e:
+        raise BadRequest(f"Bad hand {item!r}: {e}")
+    if len(cards) not in sizes:
+        raise BadRequest(f"Bad hand {item!r}: expected {'/'.join(map(str, sizes))} cards")
+    if len(set(cards)) != len(cards) or min(cards) < 0 or max(cards) > 51:
+        raise BadRequest(f"Bad hand {item!r}: cards must be distinct and 0-51")
+    return cards
+
+def read_batch(field, sizes):
+    """The list under `field` in the JSON body, parsed into integer card lists.
+
+    None when the request is too large.
+    """
+    data = request.get_data()
+    limit = request.max_content_length
+    if request.content_length is None and limit is not None and len(data) >= limit:
+        return None  # cut off at the limit, there was more
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get(field), list):
+        raise BadRequest(f"Expected a JSON object with a {field!r} list")
+    items = body[field]
+    if len(items) > API_MAX_HANDS:
+        return None
+    return [parse_hand(item, sizes) for item in items]
+
+def strengths(hands):
+    """Packed strengths for integer hands, through the fastest evaluator that fits."""
+    if np is not None and len(hands) >= BATCH_MIN and len({len(hand) for hand in hands}) == 1:
+        return strength_batch(np.array(hands, dtype=np.uint8)).tolist()
+    return [strength_cards(hand) for hand in hands]
+
+def evaluate_rows(hands):
+    return [[strength >> CATEGORY_SHIFT, strength] for strength in strengths(hands)]
+
+def compare_rows(rounds):
+    players = strengths([round_cards[0:2] + round_cards[4:9] for round_cards in rounds])
+    dealers = strengths([round_cards[2:4] + round_cards[4:9] for round_cards in rounds])
+    return [[compare_strengths(p, d), p >> CATEGORY_SHIFT, d >> CATEGORY_SHIFT]
+            for p, d in zip(players, dealers)]
+
+def respond(items, rows_for, start):
+    """Answer with rows_for(items), streamed in chunks for large batches."""
+    if len(items) < STREAM_MIN:
+        rows = rows_for(items)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        response = jsonify({'count': len(rows), 'names': HAND_OPTIONS, 'results': rows,
+                            'elapsed_ms': round(elapsed_ms, 3)})
+        response.headers['Server-Timing'] = f"evaluate;dur={elapsed_ms:.3f}"
+        return response
+
+    def generate():
+        yield f'{{"count":{len(items)},"names":{json.dumps(HAND_OPTIONS)},"results":['
+        for i in range(0, len(items), CHUNK):
+            rows = json.dumps(rows_for(items[i:i + CHUNK]), separators=(',', ':'))[1:-1]
+            yield rows if i == 0 else ',' + rows
+        yield f'],"elapsed_ms":{(time.perf_counter() - start) * 1000:.3f}}}'
+    return Response(generate(), mimetype='application/json')
+
+@api.route('/evaluate', methods=['POST'])
+def evaluate():
+    start = time.perf_counter()
+    hands = read_batch('hands', range(MIN_CARDS, MAX_CARDS + 1))
+    if hands is None:
+        return too_large()
+    return respond(hands, evaluate_rows, start)
+
+@api.route('/compare', methods=['POST'])
+def compare():
+    start = time.perf_counter()
+    rounds = read_batch('rounds', (ROUND_CARDS,))
+    if rounds is None:
+        return too_large()
+    return respond(rounds, compare_rows, start)
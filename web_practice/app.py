@@ -1,126 +1,72 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, jsonify, render_template, request, redirect, url_for, session
+from functools import lru_cache
+import atexit
+import json
+import os
 import random
-from collections import Counter
+import re
+import secrets
+import sys
 import time
 
+# The shared game modules live next to practice.py in the parent directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from cards import HAND_OPTIONS, ROUND_CARDS, cards_to_ints, ints_to_cards, parse_round_token, round_token
+from dealer import Dealer, split_round
+from drills import deal_drill, parse_category, parse_drill
+from evaluator import compare_strengths, hand_best_five, hand_category
+from exact_equity import street_equities
+from outs import describe, street_outs
+from preflop import preflop_equity
+import session_store
+from round_pool import RoundPool
+from api import api
+from metrics import Metrics
+from stats_store import StatsStore
+
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'  # Change this in production
+# Sessions live in the signed cookie by default, or on the server: 'memory' (one process only)
+# or 'sqlite' (shared by workers)
+session_store.init_app(app, os.environ.get('SESSION_BACKEND', 'cookie'))
+app.register_blueprint(api)
+# Per-route timings and counters at /metrics when METRICS=1
+metrics = Metrics(os.environ.get('METRICS') == '1')
+metrics.init_app(app)
+hand_best_five = metrics.timed('hand_best_five', hand_best_five)
+street_equities = metrics.timed('street_equities', street_equities)
+preflop_equity = metrics.timed('preflop_equity', preflop_equity)
+
+# One deck and random stream per process; set DEAL_SEED for reproducible deals
+dealer = Dealer(os.environ.get('DEAL_SEED'))
+drill_rng = random.Random(os.environ.get('DEAL_SEED'))
+
+# Learner statistics are also written to this database when STATS_DB is set
+stats_store = StatsStore(os.environ['STATS_DB']) if os.environ.get('STATS_DB') else None
+if stats_store is not None:
+    atexit.register(stats_store.close)  # write the rounds still queued before exiting
+
+# Evaluated rounds kept for refreshes of /result; older rounds are evicted
+ROUND_CACHE_SIZE = int(os.environ.get('ROUND_CACHE_SIZE', 4096))
+
+# Card images from build_assets.py: a sprite sheet and small fingerprinted files.
+# Without a build the pages fall back to the original PNGs.
+ASSET_MANIFEST = os.path.join(app.static_folder, 'build', 'manifest.json')
+ASSET_MAX_AGE = 365 * 24 * 3600  # fingerprinted files never change
+FINGERPRINTED = re.compile(r'/static/build/[^/]+\.[0-9a-f]{12}\.\w+$')  # name.<content hash>.ext
 
-SUITS = {
-    'Spades': '♠',
-    'Clubs': '♣',
-    'Hearts': '♥',
-    'Diamonds': '♦'
-}
-RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-RANK_VALUES = {r: i for i, r in enumerate(RANKS, start=2)}
-HAND_OPTIONS = [
-    "High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight",
-    "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush"
-]
-
-def card_value(card):
-    rank, _, suit = card.partition(" of ")
-    return rank, suit
-
-def rank_value(rank):
-    return RANK_VALUES[rank]
-
-def evaluate_hand(cards):
-    ranks = []
-    suits = []
-    for card in cards:
-        r, s = card_value(card)
-        ranks.append(r)
-        suits.append(s)
-    rank_counts = Counter(ranks)
-    suit_counts = Counter(suits)
-    rank_nums = sorted([rank_value(r) for r in ranks], reverse=True)
-    flush_suit = None
-    for suit, count in suit_counts.items():
-        if count >= 5:
-            flush_suit = suit
-            break
-    flush_cards = []
-    if flush_suit:
-        flush_cards = [rank_value(r) for r, s in zip(ranks, suits) if s == flush_suit]
-        flush_cards.sort(reverse=True)
-    unique_rank_nums = sorted(set(rank_nums), reverse=True)
-
-    def is_straight(vals):
-        for i in range(len(vals) - 4):
-            window = vals[i:i+5]
-            if window[0] - window[4] == 4:
-                return window[0]
-        if set([14, 5, 4, 3, 2]).issubset(set(vals)):
-            return 5
+def load_asset_manifest(path=ASSET_MANIFEST):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
         return None
 
-    straight_flush_high = None
-    if flush_suit:
-        sf_high = is_straight(flush_cards)
-        if sf_high:
-            straight_flush_high = sf_high
-
-    fours = [r for r, c in rank_counts.items() if c == 4]
-    threes = [r for r, c in rank_counts.items() if c == 3]
-    pairs = [r for r, c in rank_counts.items() if c == 2]
-
-    if straight_flush_high == 14:
-        return (9, [14])
-    if straight_flush_high:
-        return (8, [straight_flush_high])
-    if fours:
-        quad_rank = max([rank_value(r) for r in fours])
-        kickers = [r for r in rank_nums if r != quad_rank]
-        return (7, [quad_rank] + kickers)
-    if threes and (pairs or len(threes) > 1):
-        trip_rank = max([rank_value(r) for r in threes])
-        if len(threes) > 1:
-            pair_rank = max([rank_value(r) for r in threes if rank_value(r) != trip_rank])
-        else:
-            pair_rank = max([rank_value(r) for r in pairs]) if pairs else 0
-        return (6, [trip_rank, pair_rank])
-    if flush_suit:
-        top5 = flush_cards[:5]
-        return (5, top5)
-    straight_high = is_straight(unique_rank_nums)
-    if straight_high:
-        return (4, [straight_high])
-    if threes:
-        trip_rank = max([rank_value(r) for r in threes])
-        kickers = [r for r in rank_nums if r != trip_rank][:2]
-        return (3, [trip_rank] + kickers)
-    if len(pairs) >= 2:
-        top_pairs = sorted([rank_value(r) for r in pairs], reverse=True)[:2]
-        kicker = max([r for r in rank_nums if r not in top_pairs])
-        return (2, top_pairs + [kicker])
-    if pairs:
-        pair_rank = max([rank_value(r) for r in pairs])
-        kickers = [r for r in rank_nums if r != pair_rank][:3]
-        return (1, [pair_rank] + kickers)
-    return (0, rank_nums[:5])
+asset_manifest = load_asset_manifest()
 
 def hand_rank_name(rank_index):
     return HAND_OPTIONS[rank_index]
 
-def compare_hands(player_hand_rank, dealer_hand_rank):
-    if player_hand_rank[0] > dealer_hand_rank[0]:
-        return "player"
-    elif player_hand_rank[0] < dealer_hand_rank[0]:
-        return "dealer"
-    else:
-        for p_val, d_val in zip(player_hand_rank[1], dealer_hand_rank[1]):
-            if p_val > d_val:
-                return "player"
-            elif p_val < d_val:
-                return "dealer"
-        return "tie"
-
-def format_card(card_str):
-    rank, _, suit = card_str.partition(" of ")
-    return f"{rank}{SUITS[suit]}"
-
 def simple_hand_explanation(guessed_rank, correct_rank):
     if guessed_rank == correct_rank:
         return ""
@@ -145,7 +91,7 @@ def simple_hand_explanation(guessed_rank, correct_rank):
             return "This is the highest Straight Flush: Ten to Ace of the same suit, called Royal Flush."
     return f"The correct hand is {HAND_OPTIONS[correct_rank]}, which differs from your guess."
 
-def card_image_filename(card):
+def card_image_name(card):
     rank, _, suit = card.partition(' of ')
     rank = rank.lower()
     suit = suit.lower()
@@ -159,8 +105,117 @@ def card_image_filename(card):
         rank = 'king'
     elif rank == 'ace':
         rank = 'ace'
+    return f"{rank}_of_{suit}"
+
+def card_image_filename(card):
+    name = card_image_name(card)
+    if asset_manifest:
+        # e.g. build/2_of_clubs.df6cb048a422.webp
+        return asset_manifest['cards'][name]
     # e.g. card_images/2_of_clubs.png -> static/card_images/2_of_clubs.png for url_for
-    return f"card_images/{rank}_of_{suit}.png"
+    return f"card_images/{name}.png"
+
+def card_image(card, mark=None):
+    """What the templates need to draw a card: its file and, when built, its sprite offset.
+
+    mark is 'used' or 'kicker' for a card that plays in the hand being shown.
+    """
+    image = {'name': card, 'file': card_image_filename(card), 'sprite': None, 'mark': mark}
+    if asset_manifest:
+        col, row = asset_manifest['sprite']['positions'][card_image_name(card)]
+        width, height = card_sprite()['width'], asset_manifest['display_height']
+        image['sprite'] = f"-{col * width}px -{row * height}px"
+    return image
+
+def card_marks(used, kickers):
+    """card_image() marks for the 7 cards of a hand from a round_outcome() used/kickers pair."""
+    marks = [None] * 7
+    for i in used:
+        marks[i] = 'kicker' if i in kickers else 'used'
+    return marks
+
+@lru_cache(maxsize=1)
+def card_sprite():
+    """The sprite sheet's static file and its size when drawn at display height."""
+    sprite = asset_manifest['sprite']
+    cell_width, cell_height = asset_manifest['cell']
+    height = asset_manifest['display_height']
+    width = round(cell_width * height / cell_height)
+    return {
+        'file': sprite['file'],
+        'width': width,
+        'height': height,
+        'size': f"{width * sprite['columns']}px {height * sprite['rows']}px",
+    }
+
+@app.context_processor
+def inject_card_sprite():
+    return {'card_sprite': card_sprite() if asset_manifest else None}
+
+@app.after_request
+def cache_built_assets(response):
+    # Built file names change with their content, so browsers may keep them for good.
+    # manifest.json keeps its name and gets Flask's usual caching.
+    # Flask's static route already adds an ETag and answers If-None-Match with 304.
+    if FINGERPRINTED.match(request.path) and response.status_code in (200, 304):
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+def round_hands(token):
+    """(player_hand, dealer_hand, community_cards) as card strings for a round token."""
+    return split_round(ints_to_cards(parse_round_token(token)))
+
+@lru_cache(maxsize=ROUND_CACHE_SIZE)
+def round_outcome(token):
+    """Evaluate a round once; later calls for the same round token hit the cache.
+
+    The token holds the cards themselves, so replays of a round share its
+    entry. Callers must not modify the returned dict.
+    """
+    player_hand, dealer_hand, community_cards = round_hands(token)
+    player_strength, player_used, player_kickers = hand_best_five(player_hand + community_cards)
+    dealer_strength, dealer_used, dealer_kickers = hand_best_five(dealer_hand + community_cards)
+    return {
+        'player_category': hand_category(player_strength),
+        'dealer_category': hand_category(dealer_strength),
+        # indexes into hole cards + community cards of the five that play
+        'player_used': tuple(player_used),
+        'player_kickers': tuple(player_kickers),
+        'dealer_used': tuple(dealer_used),
+        'dealer_kickers': tuple(dealer_kickers),
+        'winner': compare_strengths(player_strength, dealer_strength),
+        'preflop_odds': preflop_equity(player_hand, dealer_hand),
+    }
+
+def make_round():
+    """Deal a round and evaluate it into the round_outcome cache; returns its token."""
+    return start_round(dealer.deal(ROUND_CARDS))
+
+def make_drill_round(player_category, dealer_category=None):
+    """A round where the player (and optionally the dealer) holds the given hand."""
+    player_hand, dealer_hand, community_cards = deal_drill(player_category, dealer_category, drill_rng)
+    return start_round(player_hand + dealer_hand + community_cards)
+
+def start_round(cards):
+    token = round_token(cards)
+    round_outcome(token)
+    return token
+
+# Rounds dealt and evaluated ahead of time by a background thread; ROUND_POOL_HIGH=0 turns it off.
+# Filled before the first request so a burst right after startup doesn't run it dry.
+round_pool = RoundPool(make_round,
+                       int(os.environ.get('ROUND_POOL_LOW', 64)),
+                       int(os.environ.get('ROUND_POOL_HIGH', 256)))
+round_pool.start(fill=True)
+
+def user_id():
+    """Anonymous id that stats are recorded under, kept for the life of the session."""
+    if 'user_id' not in session:
+        session['user_id'] = secrets.token_urlsafe(8)
+    return session['user_id']
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -168,19 +223,55 @@ def index():
         session['player_money'] = 100
         session['dealer_money'] = 100
     if request.method == 'POST':
+        # Drill mode: an empty choice means any hand
+        drill = request.form.get('drill', '')
+        drill_vs = request.form.get('drill_vs', '')
+        try:
+            session['drill'] = list(parse_drill(drill, drill_vs)) if drill else None
+        except ValueError as e:
+            # Unknown or impossible pair: show the form again with the choice and why
+            session.pop('drill', None)
+            return render_index([form_category(drill), form_category(drill_vs)], str(e))
         return redirect(url_for('new_round'))
-    return render_template('index.html', player_money=session['player_money'], dealer_money=session['dealer_money'])
+    return render_index(session.get('drill') or [None, None])
+
+def form_category(text):
+    try:
+        return parse_category(text)
+    except ValueError:
+        return None
+
+def render_index(drill, error=None):
+    return render_template('index.html', player_money=session['player_money'], dealer_money=session['dealer_money'],
+                           hand_options=HAND_OPTIONS, drill=drill[0], drill_vs=drill[1], error=error)
 
 @app.route('/new_round', methods=['GET', 'POST'])
 def new_round():
-    deck = [f"{rank} of {suit}" for suit in SUITS for rank in RANKS]
-    random.shuffle(deck)
-    player_hand = [deck.pop(), deck.pop()]
-    dealer_hand = [deck.pop(), deck.pop()]
-    community_cards = [deck.pop() for _ in range(5)]
-    session['player_hand'] = player_hand
-    session['dealer_hand'] = dealer_hand
-    session['community_cards'] = community_cards
+    drill = session.get('drill')
+    try:
+        dealt = make_drill_round(*drill) if drill else round_pool.pop()
+    except ValueError:
+        # A pair that can never be dealt, say from a session saved by an older
+        # version; go back to ordinary deals
+        session.pop('drill', None)
+        dealt = round_pool.pop()
+    return begin_round(dealt)
+
+@app.route('/round/<token>')
+def replay_round(token):
+    """Play the round of a token again, e.g. from a link on the result page."""
+    try:
+        parse_round_token(token)
+    except ValueError:
+        return "Unknown round", 404
+    session.setdefault('player_money', 100)
+    session.setdefault('dealer_money', 100)
+    return begin_round(token)
+
+def begin_round(token):
+    # round_id is new for every round played, replays too, so each one is paid out once
+    session['round'] = token
+    session['round_id'] = secrets.token_urlsafe(8)
     session['pot'] = 20
     session['player_money'] -= 10
     session['dealer_money'] -= 10
@@ -188,9 +279,9 @@ def new_round():
 
 @app.route('/quiz', methods=['GET', 'POST'])
 def quiz():
-    player_hand = session.get('player_hand')
-    dealer_hand = session.get('dealer_hand')
-    community_cards = session.get('community_cards')
+    if 'round' not in session:
+        return redirect(url_for('index'))  # the session expired or was lost
+    player_hand, dealer_hand, community_cards = round_hands(session['round'])
     error = None
     # Initialize stats in session if not present
     if 'stats' not in session:
@@ -218,9 +309,9 @@ def quiz():
         session['winner_id_time'] = winner_id_time
         return redirect(url_for('result'))
     # Pass card image filenames to the template
-    player_hand_imgs = [card_image_filename(card) for card in player_hand]
-    dealer_hand_imgs = [card_image_filename(card) for card in dealer_hand]
-    community_card_imgs = [card_image_filename(card) for card in community_cards]
+    player_hand_imgs = [card_image(card) for card in player_hand]
+    dealer_hand_imgs = [card_image(card) for card in dealer_hand]
+    community_card_imgs = [card_image(card) for card in community_cards]
     return render_template('quiz.html',
         player_hand=player_hand,
         dealer_hand=dealer_hand,
@@ -236,35 +327,39 @@ def quiz():
 
 @app.route('/result')
 def result():
-    player_hand = session.get('player_hand')
-    dealer_hand = session.get('dealer_hand')
-    community_cards = session.get('community_cards')
+    if 'round' not in session:
+        return redirect(url_for('index'))
+    token = session['round']
+    player_hand, dealer_hand, community_cards = round_hands(token)
     player_guess = session.get('player_guess')
     dealer_guess = session.get('dealer_guess')
     winner_guess = session.get('winner_guess')
+    round_id = session.get('round_id')
     pot = session.get('pot')
-    player_money = session.get('player_money')
-    dealer_money = session.get('dealer_money')
 
-    player_best = evaluate_hand(player_hand + community_cards)
-    dealer_best = evaluate_hand(dealer_hand + community_cards)
-    actual_winner = compare_hands(player_best, dealer_best)
+    outcome = round_outcome(token)
+    player_category = outcome['player_category']
+    dealer_category = outcome['dealer_category']
+    actual_winner = outcome['winner']
 
-    player_correct = (player_guess == player_best[0])
-    dealer_correct = (dealer_guess == dealer_best[0])
+    player_correct = (player_guess == player_category)
+    dealer_correct = (dealer_guess == dealer_category)
     winner_correct = (winner_guess == actual_winner)
 
-    player_explanation = simple_hand_explanation(player_guess, player_best[0]) if not player_correct else ""
-    dealer_explanation = simple_hand_explanation(dealer_guess, dealer_best[0]) if not dealer_correct else ""
+    player_explanation = simple_hand_explanation(player_guess, player_category) if not player_correct else ""
+    dealer_explanation = simple_hand_explanation(dealer_guess, dealer_category) if not dealer_correct else ""
 
-    # Update money
-    if actual_winner == "player":
-        session['player_money'] += pot
-    elif actual_winner == "dealer":
-        session['dealer_money'] += pot
-    else:
-        session['player_money'] += pot // 2
-        session['dealer_money'] += pot // 2
+    # Settle each round once; refreshing /result or going back to it must not pay out again
+    settle = session.get('settled_round_id') != round_id
+    if settle:
+        session['settled_round_id'] = round_id
+        if actual_winner == "player":
+            session['player_money'] += pot
+        elif actual_winner == "dealer":
+            session['dealer_money'] += pot
+        else:
+            session['player_money'] += pot // 2
+            session['dealer_money'] += pot // 2
 
     hand_id_time = session.get('hand_id_time', 0.0)
     winner_id_time = session.get('winner_id_time', 0.0)
@@ -275,8 +370,7 @@ def result():
         'total_failed_hand_ids': 0,
         'total_failed_winner_ids': 0
     })
-    # Only update stats if this is a new round (not a page refresh)
-    if hand_id_time > 0 or winner_id_time > 0:
+    if settle:
         stats['total_time_identify_hands'] += hand_id_time
         stats['total_time_identify_winner'] += winner_id_time
         stats['total_rounds'] += 1
@@ -291,12 +385,22 @@ def result():
         stats['total_failed_hand_ids'] += failed_hand
         stats['total_failed_winner_ids'] += failed_winner
         session['stats'] = stats
+        if stats_store is not None:
+            stats_store.record(user_id(), player_category, dealer_category, player_guess, dealer_guess,
+                               actual_winner, winner_guess, hand_id_time, winner_id_time, source='web')
     avg_hand_id_time = stats['total_time_identify_hands'] / stats['total_rounds'] if stats['total_rounds'] else 0
     avg_winner_id_time = stats['total_time_identify_winner'] / stats['total_rounds'] if stats['total_rounds'] else 0
-    # Pass card image filenames to the template
-    player_hand_imgs = [card_image_filename(card) for card in player_hand]
-    dealer_hand_imgs = [card_image_filename(card) for card in dealer_hand]
-    community_card_imgs = [card_image_filename(card) for card in community_cards]
+    # Pass card image filenames to the template, marking the cards each hand plays;
+    # the board shows the winner's (the player's on a tie)
+    player_marks = card_marks(outcome['player_used'], outcome['player_kickers'])
+    dealer_marks = card_marks(outcome['dealer_used'], outcome['dealer_kickers'])
+    board_marks = dealer_marks if actual_winner == 'dealer' else player_marks
+    player_hand_imgs = [card_image(card, player_marks[i]) for i, card in enumerate(player_hand)]
+    dealer_hand_imgs = [card_image(card, dealer_marks[i]) for i, card in enumerate(dealer_hand)]
+    community_card_imgs = [card_image(card, board_marks[i + 2]) for i, card in enumerate(community_cards)]
+    # Flop and turn outs; only shown once answered, since the river is face up on the quiz
+    outs_hints = [(street, describe(outs)) for street, outs in street_outs(
+        cards_to_ints(player_hand), cards_to_ints(dealer_hand), cards_to_ints(community_cards))]
     return render_template('result.html',
         player_hand=player_hand,
         dealer_hand=dealer_hand,
@@ -305,14 +409,19 @@ def result():
         player_guess=player_guess,
         dealer_guess=dealer_guess,
         winner_guess=winner_guess,
-        player_best=player_best,
-        dealer_best=dealer_best,
+        player_category=player_category,
+        dealer_category=dealer_category,
         actual_winner=actual_winner,
         player_correct=player_correct,
         dealer_correct=dealer_correct,
         winner_correct=winner_correct,
         player_explanation=player_explanation,
         dealer_explanation=dealer_explanation,
+        # Worked out here rather than in round_outcome() so the pool thread doesn't
+        # spend the GIL on them; exact_equity caches each spot for refreshes
+        street_odds=street_equities(player_hand, dealer_hand, community_cards),
+        preflop_odds=outcome['preflop_odds'],
+        outs_hints=outs_hints,
         player_money=session['player_money'],
         dealer_money=session['dealer_money'],
         hand_id_time=hand_id_time,
@@ -326,9 +435,27 @@ def result():
         total_failed_winner_ids=stats['total_failed_winner_ids'],
         player_hand_imgs=player_hand_imgs,
         dealer_hand_imgs=dealer_hand_imgs,
-        community_card_imgs=community_card_imgs
+        community_card_imgs=community_card_imgs,
+        round_token=token
     )
 
+@app.route('/pool_stats')
+def pool_stats():
+    return jsonify(round_pool.stats())
+
+@app.route('/stats')
+def stats_report():
+    if stats_store is None:
+        return jsonify({'error': "Statistics are off; set STATS_DB"}), 404
+    user = user_id()
+    return jsonify({
+        'user': user,
+        'totals': stats_store.user_totals(user),
+        'error_rates': {HAND_OPTIONS[category]: rate
+                        for category, (_, _, rate) in stats_store.category_error_rates(user).items()},
+        'leaderboard': stats_store.leaderboard(),
+    })
+
 @app.route('/reset')
 def reset():
     session.clear()
@@ -0,0 +1,124 @@
+"""
+Build the card images the pages actually use.
+
+The source images in static/card_images are 500x726 PNGs (about 70 KB
+each) but the pages show them 80 pixels high. This writes to static/build:
+
+- one sprite sheet with all 52 cards (13 columns by suit rows), so a page
+  needs a single image request however many cards it shows
+- a small WebP of every card, for anything that wants a single card
+- manifest.json, mapping each card to its file and sprite position
+
+Every file name carries a hash of its content, so the app can serve them
+with a far-future cache lifetime: a changed image gets a new name. A
+rebuild keeps the files of the previous build, which running servers and
+cached pages may still ask for, and removes older ones once the new
+manifest is in place.
+
+    cd web_practice && python3 build_assets.py
+
+Requires Pillow (pip install Pillow).
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(HERE, 'static', 'card_images')
+BUILD_DIR = os.path.join(HERE, 'static', 'build')
+MANIFEST = os.path.join(BUILD_DIR, 'manifest.json')
+
+SUITS = ['spades', 'clubs', 'hearts', 'diamonds']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
+DISPLAY_HEIGHT = 80
+SCALE = 2  # pixels per CSS pixel, so the cards stay sharp on high-density screens
+QUALITY = 85
+
+def fingerprinted(data, name, ext):
+    """Write data to BUILD_DIR as name.<hash>.ext; returns the path relative to static/."""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    filename = f"{name}.{digest}.{ext}"
+    with open(os.path.join(BUILD_DIR, filename), 'wb') as f:
+        f.write(data)
+    return f"build/{filename}"
+
+def encode(image, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=quality, method=6)
+    return buffer.getvalue()
+
+def manifest_files(manifest):
+    """File names in BUILD_DIR that a manifest refers to."""
+    paths = [manifest['sprite']['file']] + list(manifest['cards'].values())
+    return {os.path.basename(path) for path in paths}
+
+def load_manifest(path=MANIFEST):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def build(quality=QUALITY, height=DISPLAY_HEIGHT * SCALE):
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    previous = load_manifest()
+
+    # Every card gets the cell size of the first one (they all share one aspect ratio)
+    with Image.open(os.path.join(SOURCE_DIR, f"{RANKS[0]}_of_{SUITS[0]}.png")) as first:
+        cell = (round(first.width * height / first.height), height)
+    sheet = Image.new('RGBA', (cell[0] * len(RANKS), cell[1] * len(SUITS)), (0, 0, 0, 0))
+    cards = {}
+    positions = {}
+    for row, suit in enumerate(SUITS):
+        for col, rank in enumerate(RANKS):
+            name = f"{rank}_of_{suit}"
+            with Image.open(os.path.join(SOURCE_DIR, f"{name}.png")) as source:
+                image = source.convert('RGBA').resize(cell, Image.LANCZOS)
+            sheet.paste(image, (col * cell[0], row * cell[1]))
+            cards[name] = fingerprinted(encode(image, quality), name, 'webp')
+            positions[name] = [col, row]
+
+    manifest = {
+        'display_height': DISPLAY_HEIGHT,
+        'cell': list(cell),
+        'sprite': {
+            'file': fingerprinted(encode(sheet, quality), 'cards', 'webp'),
+            'columns': len(RANKS),
+            'rows': len(SUITS),
+            'positions': positions,
+        },
+        'cards': cards,
+    }
+    # Replace the manifest in one step so the app never reads half of it
+    with open(MANIFEST + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(MANIFEST + '.tmp', MANIFEST)
+
+    keep = manifest_files(manifest) | {os.path.basename(MANIFEST)}
+    if previous:
+        keep |= manifest_files(previous)
+    for name in os.listdir(BUILD_DIR):
+        if name not in keep:
+            os.remove(os.path.join(BUILD_DIR, name))
+    return manifest
+
+def folder_size(paths):
+    return sum(os.path.getsize(os.path.join(HERE, 'static', path)) for path in paths)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sprite sheet and small card images.")
+    parser.add_argument('--quality', type=int, default=QUALITY, help="WebP quality, 0-100")
+    args = parser.parse_args()
+    manifest = build(args.quality)
+    sources = [f"card_images/{name}.png" for name in manifest['cards']]
+    print(f"Source PNGs:   {folder_size(sources):10,} bytes in {len(sources)} files")
+    print(f"Card WebPs:    {folder_size(manifest['cards'].values()):10,} bytes")
+    print(f"Sprite sheet:  {folder_size([manifest['sprite']['file']]):10,} bytes  {manifest['sprite']['file']}")
+
+if __name__ == "__main__":
+    main()
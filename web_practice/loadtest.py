@@ -0,0 +1,158 @@
+"""
+Load test for the web game's round flow.
+
+Simulated learners each open the start page and then play rounds:
+/new_round, /quiz (GET), /quiz (POST with random answers), /result.
+Sessions run in parallel threads and the report gives the throughput and
+the p50/p95/p99 latency and response size of every route.
+
+By default the app runs in this process through Flask's test client, so
+nothing touches the network; --url drives an already running local server
+instead (python3 app.py) over HTTP.
+
+    cd web_practice && python3 loadtest.py --sessions 200 --rounds 20 --concurrency 16
+    SESSION_BACKEND=sqlite python3 loadtest.py --json sqlite.json
+    python3 loadtest.py --url http://127.0.0.1:5000
+"""
+
+import argparse
+import http.cookiejar
+import json
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROUND = [
+    ('GET', '/new_round'),
+    ('GET', '/quiz'),
+    ('POST', '/quiz'),
+    ('GET', '/result'),
+]
+ROUTE_NAMES = ['GET /'] + [f"{method} {path}" for method, path in ROUND]
+
+class TestClientSession:
+    """One learner's cookies, talking to the app in this process."""
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, len(response.data)
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # The game answers with redirects; time each request on its own like the test client does
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class HttpSession:
+    """One learner's cookies, talking to a running server."""
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(urllib.request.Request(self.url + path, body, method=method)) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, len(e.read())
+
+def run_session(make_session, rounds, seed):
+    """Play `rounds` rounds in one session; returns {route: [(seconds, bytes, status), ...]}."""
+    rng = random.Random(seed)
+    session = make_session()
+    samples = {name: [] for name in ROUTE_NAMES}
+
+    def timed(name, method, path, data=None):
+        start = time.perf_counter()
+        status, size = session.request(method, path, data)
+        samples[name].append((time.perf_counter() - start, size, status))
+
+    timed('GET /', 'GET', '/')
+    for _ in range(rounds):
+        for method, path in ROUND:
+            data = None
+            if method == 'POST':
+                now = str(time.time())
+                data = {'start_hand_time': now, 'start_winner_time': now,
+                        'player_hand': str(rng.randrange(10)), 'dealer_hand': str(rng.randrange(10)),
+                        'winner': rng.choice(['player', 'dealer', 'tie'])}
+            timed(f"{method} {path}", method, path, data)
+    return samples
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def summarize(samples, wall):
+    routes = {}
+    total = 0
+    for name in ROUTE_NAMES:
+        entries = samples[name]
+        times = sorted(seconds for seconds, _, _ in entries)
+        sizes = [size for _, size, _ in entries]
+        total += len(entries)
+        routes[name] = {
+            'requests': len(entries),
+            'errors': sum(1 for _, _, status in entries if status >= 400),
+            'p50_ms': percentile(times, 0.50) * 1000,
+            'p95_ms': percentile(times, 0.95) * 1000,
+            'p99_ms': percentile(times, 0.99) * 1000,
+            'max_ms': times[-1] * 1000 if times else 0.0,
+            'mean_bytes': sum(sizes) / len(sizes) if sizes else 0,
+        }
+    return {
+        'wall_seconds': wall,
+        'requests': total,
+        'requests_per_sec': total / wall if wall else 0.0,
+        'rounds_per_sec': routes['GET /result']['requests'] / wall if wall else 0.0,
+        'routes': routes,
+    }
+
+def load_test(make_session, sessions, rounds, concurrency, seed=None):
+    merged = {name: [] for name in ROUTE_NAMES}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        seeds = [None if seed is None else f"{seed}:{i}" for i in range(sessions)]
+        for samples in pool.map(lambda s: run_session(make_session, rounds, s), seeds):
+            for name, entries in samples.items():
+                merged[name].extend(entries)
+    return summarize(merged, time.perf_counter() - start)
+
+def report(summary):
+    print(f"{summary['requests']:,} requests in {summary['wall_seconds']:.2f}s: "
+          f"{summary['requests_per_sec']:,.0f} requests/s, {summary['rounds_per_sec']:,.1f} rounds/s\n")
+    print(f"{'Route':18} {'Requests':>9} {'Errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'Bytes':>8}")
+    for name, route in summary['routes'].items():
+        print(f"{name:18} {route['requests']:9,} {route['errors']:7,} {route['p50_ms']:8.2f} {route['p95_ms']:8.2f} "
+              f"{route['p99_ms']:8.2f} {route['max_ms']:8.2f} {route['mean_bytes']:8,.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive many simulated sessions through the round flow.")
+    parser.add_argument('--sessions', type=int, default=100, help="simulated learners")
+    parser.add_argument('--rounds', type=int, default=10, help="rounds per learner")
+    parser.add_argument('--concurrency', type=int, default=8, help="learners playing at the same time")
+    parser.add_argument('--url', default=None, help="test a running server instead of the app in this process")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the answers")
+    parser.add_argument('--json', metavar='FILE', help="also write the summary as JSON")
+    args = parser.parse_args()
+
+    if args.url:
+        make_session = lambda: HttpSession(args.url)
+    else:
+        from app import app
+        make_session = lambda: TestClientSession(app)
+    summary = load_test(make_session, args.sessions, args.rounds, args.concurrency, args.seed)
+    report(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Request metrics for the Flask app, served at /metrics in Prometheus text format.
+
+Records, per process:
+
+- request latency per route and method (histogram)
+- template render time per template (histogram)
+- calls and time of wrapped evaluator functions (see Metrics.timed)
+- serialized session size (histogram)
+
+Turn it on with METRICS=1. When it is off nothing is registered with the
+app and Metrics.timed() returns functions unwrapped, so there is no cost.
+
+Optionally one request in PROFILE_EVERY is run under cProfile, and its
+profile is written to PROFILE_DIR when it took at least PROFILE_SLOW_MS:
+
+    METRICS=1 PROFILE_EVERY=50 PROFILE_SLOW_MS=100 python3 app.py
+    python3 -m pstats profiles/<file>.prof
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import Response, g, request, session, before_render_template, template_rendered
+
+PREFIX = 'webpractice'
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {total}'
+        braces = f'{{{labels}}}' if labels else ''
+        yield f'{name}_sum{braces} {self.sum}'
+        yield f'{name}_count{braces} {total}'
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._requests = {}   # (route, method) -> Histogram
+        self._templates = {}  # template -> Histogram
+        self._calls = {}      # function -> [calls, seconds]
+        self._session_bytes = Histogram(SIZE_BUCKETS)
+        self.profile_every = int(os.environ.get('PROFILE_EVERY', 0))
+        self.profile_slow = float(os.environ.get('PROFILE_SLOW_MS', 0)) / 1000
+        self.profile_dir = os.environ.get('PROFILE_DIR', 'profiles')
+        self._requests_seen = 0
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._rendered, app)
+        app.add_url_rule('/metrics', 'metrics', self.render)
+
+    def _observe(self, table, key, buckets, value):
+        with self._lock:
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timed(self, name, func):
+        """func wrapped to count its calls and time, or func itself when disabled."""
+        if not self.enabled:
+            return func
+        self._calls[name] = [0, 0.0]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    entry = self._calls[name]
+                    entry[0] += 1
+                    entry[1] += elapsed
+        return wrapper
+
+    # --- Flask hooks ---
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        if self.profile_every:
+            with self._lock:
+                self._requests_seen += 1
+                sample = self._requests_seen % self.profile_every == 0
+            if sample:
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:
+                    return  # another profiler is running in this process
+                g.metrics_profiler = profiler
+
+    def _after_request(self, response):
+        elapsed = time.perf_counter() - g.metrics_start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        self._observe(self._requests, (route, request.method), LATENCY_BUCKETS, elapsed)
+        if session:
+            size = len(json.dumps(dict(session), separators=(',', ':'), default=str))
+            with self._lock:
+                self._session_bytes.observe(size)
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed >= self.profile_slow:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route.strip('/').replace('/', '_') or 'index'}-{elapsed * 1000:.0f}ms.prof"
+                profiler.dump_stats(os.path.join(self.profile_dir, name))
+        return response
+
+    def _before_render(self, app, template, context, **extra):
+        g.metrics_render_start = time.perf_counter()
+
+    def _rendered(self, app, template, context, **extra):
+        start = g.pop('metrics_render_start', None)
+        if start is not None:
+            self._observe(self._templates, template.name, LATENCY_BUCKETS, time.perf_counter() - start)
+
+    # --- Exposition ---
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines.append(f'# HELP {PREFIX}_request_seconds Request latency by route.')
+            lines.append(f'# TYPE {PREFIX}_request_seconds histogram')
+            for (route, method), histogram in sorted(self._requests.items()):
+                lines.extend(histogram.lines(f'{PREFIX}_request_seconds', f'route="{route}",method="{method}"'))
+            lines.append(f'# HELP {PREFIX}_template_render_seconds Template render time.')
+            lines.append(f'# TYPE {PREFIX}_template_render_seconds histogram')
+            for template, histogram in sorted(self._templates.items()):
+                lines.extend(histogram.lines(f'{PREFIX}_template_render_seconds', f'template="{template}"'))
+            lines.append(f'# HELP {PREFIX}_evaluator_calls_total Calls of evaluator functions.')
+            lines.append(f'# TYPE {PREFIX}_evaluator_calls_total counter')
+            for name, (calls, _) in sorted(self._calls.items()):
+                lines.append(f'{PREFIX}_evaluator_calls_total{{function="{name}"}} {calls}')
+            lines.append(f'# HELP {PREFIX}_evaluator_seconds_total Time spent in evaluator functions.')
+            lines.append(f'# TYPE {PREFIX}_evaluator_seconds_total counter')
+            for name, (_, seconds) in sorted(self._calls.items()):
+                lines.append(f'{PREFIX}_evaluator_seconds_total{{function="{name}"}} {seconds}')
+            lines.append(f'# HELP {PREFIX}_session_bytes Serialized session size at the end of a request.')
+            lines.append(f'# TYPE {PREFIX}_session_bytes histogram')
+            lines.extend(self._session_bytes.lines(f'{PREFIX}_session_bytes', ''))
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,124 @@
+"""
+A pool of ready-to-play rounds for /new_round.
+
+Dealing is cheap but evaluating a round (both best hands, the winner and
+the preflop odds) is less so, so a background thread deals and evaluates
+rounds ahead of time. When the pool drops below the low watermark the
+thread wakes up and refills it to the high watermark; /new_round then just
+pops a finished round. If a burst of traffic empties the pool, rounds are
+made on the request thread until it catches up. make_round() should stay
+light: the thread holds the GIL while it runs, slowing every request.
+
+    pool = RoundPool(make_round, low=64, high=256)
+    pool.start(fill=True)  # at startup, before the first request
+    token = pool.pop()  # whatever make_round returns, here a round token
+    pool.stats()  # depth, refill rate, misses, errors, ...
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+DEFAULT_LOW = 64
+DEFAULT_HIGH = 256
+MIN_BACKOFF = 0.1  # seconds before refilling again after make_round() failed, doubling
+MAX_BACKOFF = 30.0
+
+log = logging.getLogger(__name__)
+
+class RoundPool:
+    def __init__(self, make_round, low=DEFAULT_LOW, high=DEFAULT_HIGH):
+        if high and not 0 < low <= high:
+            raise ValueError("Need 0 < low <= high watermark (high=0 turns the pool off)")
+        self.make_round = make_round
+        self.low = low
+        self.high = high
+        self._rounds = deque()
+        self._wake = threading.Condition()
+        self._thread = None
+        self.served = 0
+        self.misses = 0  # rounds made on the request thread because the pool was empty
+        self.refills = 0
+        self.refilled = 0
+        self.refill_seconds = 0.0
+        self.errors = 0  # make_round() failures on the refill thread
+
+    def start(self, fill=False):
+        """Start the refill thread (pop() does this on first use).
+
+        With fill, first make rounds up to the high watermark on this thread.
+        """
+        if fill and self.high:
+            try:
+                for _ in range(self.high - len(self._rounds)):
+                    entry = self.make_round()
+                    with self._wake:
+                        self._rounds.append(entry)
+            except Exception:
+                # The refill thread retries with backoff
+                log.exception("Filling the round pool failed")
+                with self._wake:
+                    self.errors += 1
+        with self._wake:
+            if self._thread is None and self.high:
+                self._thread = threading.Thread(target=self._run, name='round-pool', daemon=True)
+                self._thread.start()
+
+    def pop(self):
+        if self._thread is None:
+            self.start()
+        with self._wake:
+            self.served += 1
+            if self._rounds:
+                entry = self._rounds.popleft()
+                if len(self._rounds) < self.low:
+                    self._wake.notify()
+                return entry
+            self.misses += 1
+            self._wake.notify()
+        return self.make_round()
+
+    def _run(self):
+        backoff = 0
+        while True:
+            with self._wake:
+                # Fill up straight away on start, then whenever we fall below low
+                while self.refills and len(self._rounds) >= self.low:
+                    self._wake.wait()
+                need = self.high - len(self._rounds)
+            start = time.perf_counter()
+            made = 0
+            try:
+                for _ in range(need):
+                    entry = self.make_round()
+                    with self._wake:
+                        self._rounds.append(entry)
+                    made += 1
+                backoff = 0
+            except Exception:
+                # Keep the thread alive; pop() makes rounds itself until refilling works again
+                log.exception("Refilling the round pool failed")
+                backoff = min(backoff * 2 or MIN_BACKOFF, MAX_BACKOFF)
+                with self._wake:
+                    self.errors += 1
+            with self._wake:
+                self.refills += 1
+                self.refilled += made
+                self.refill_seconds += time.perf_counter() - start
+            if backoff:
+                time.sleep(backoff)
+
+    def stats(self):
+        with self._wake:
+            return {
+                'depth': len(self._rounds),
+                'low': self.low,
+                'high': self.high,
+                'served': self.served,
+                'misses': self.misses,
+                'refills': self.refills,
+                'refilled': self.refilled,
+                'errors': self.errors,
+                'refill_rate': self.refilled / self.refill_seconds if self.refill_seconds else 0.0,
+            }
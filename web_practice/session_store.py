@@ -0,0 +1,156 @@
+"""
+Server-side sessions for the Flask app.
+
+Flask's default session puts the whole session dict in a signed cookie,
+so every request serializes, signs, ships and re-verifies all of it. With
+these backends the cookie only carries a random session id and the data
+stays on the server:
+
+- MemoryStore: in-process dict with least-recently-used eviction and a
+  time-to-live. Fast, but for a single process only: each worker has its
+  own sessions and a restart loses them.
+- SQLiteStore: one SQLite file shared by every worker process.
+
+Install with init_app(app, backend), where backend is 'cookie' (Flask's
+default), 'memory' or 'sqlite'. The routes keep using flask.session as
+before.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+DEFAULT_MAX_ENTRIES = 10000
+SQLITE_PURGE_EVERY = 1000  # writes between sweeps of expired rows
+
+class MemoryStore:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # sid -> (expires, data as JSON), oldest use first; storing text means
+        # nested values like the stats dict can't be changed behind the store's back
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+        return json.loads(data)
+
+    def set(self, sid, data, ttl):
+        data = json.dumps(data, separators=(',', ':'))
+        with self._lock:
+            self._data[sid] = (time.time() + ttl, data)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, expires REAL, data TEXT)")
+
+    def _connect(self):
+        # One connection per thread; WAL lets worker processes read while one writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires >= ?", (sid, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data, ttl):
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO sessions (sid, expires, data) VALUES (?, ?, ?)",
+                     (sid, time.time() + ttl, json.dumps(data, separators=(',', ':'))))
+        self._writes += 1
+        if self._writes % SQLITE_PURGE_EVERY == 0:
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (time.time(),))
+
+    def delete(self, sid):
+        self._connect().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not self.should_set_cookie(app, session):
+            return
+        self.store.set(session.sid, dict(session), app.permanent_session_lifetime.total_seconds())
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+def init_app(app, backend='cookie'):
+    """Switch the app's sessions to the given backend."""
+    if backend == 'cookie':
+        return
+    if backend == 'memory':
+        store = MemoryStore(int(os.environ.get('SESSION_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)))
+    elif backend == 'sqlite':
+        store = SQLiteStore(os.environ.get(
+            'SESSION_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db')))
+    else:
+        raise ValueError(f"Unknown session backend: {backend!r}")
+    app.session_interface = ServerSideSessionInterface(store)